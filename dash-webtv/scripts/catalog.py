@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Client-side readers for the catalog parse-m3u.py writes
+
+parse-m3u.py is a script (its name is not importable); everything needed
+to read its output lives here instead:
+
+    from catalog import ColumnarCatalog, expand_entry, load_strings, search_titles
+
+    movies = ColumnarCatalog('data/movies.columns.json')
+    movies.row(0)                              # same dict as movies.json[0]
+    expand_entry(entry, load_strings('data'))  # undo --compact-urls
+    search_titles('data', 'matr')              # positions in movies.json
+"""
+
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+COLUMNAR_FORMAT = "columnar-v2"
+
+KIND_CODES = {"movies": "m", "series": "s", "live": "l"}
+
+def normalize_title(title):
+    """
+    Casefolded, accents stripped, punctuation to spaces: "Déjà Vu (2019)" ->
+    "deja vu 2019". Letters of every script are kept ("فيلم الرسالة",
+    "Титаник" -> "титаник").
+    """
+    if title.isascii():
+        return ' '.join(re.sub(r'[^a-z0-9]+', ' ', title.lower()).split())
+    text = unicodedata.normalize('NFKD', title.casefold())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[\W_]+', ' ', text).split())
+
+def title_trigrams(normalized):
+    """Character trigrams of each word, padded so short words still get one"""
+    grams = set()
+    for word in normalized.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _shard_char(c):
+    if c.isascii():
+        return c if c.isalnum() else "_"
+    # Other scripts: a stable bucket per code point ("ф" -> "-44")
+    return f"-{ord(c) % 256:02x}"
+
+def shard_name(term):
+    """Two-character prefix shard: "matrix" -> "ma", " ma" (trigram) -> "_m", "фильм" -> "-44-38" """
+    return ''.join(_shard_char(c) for c in term[:2])
+
+def load_strings(output_dir):
+    """The string table written next to a --compact-urls catalog"""
+    with open(os.path.join(output_dir, "strings.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def expand_url(value, strings):
+    if isinstance(value, str):
+        return value
+    template, stream_id, ext = value
+    return f"{strings['url_templates'][template]}{stream_id}.{ext}"
+
+def expand_entry(entry, strings):
+    """Full {name, poster, category, url, id, ext, ...} entry from its compact form"""
+    if "u" not in entry:
+        return entry
+    full = {"name": entry["name"]}
+    poster = entry.get("p", "")
+    if not isinstance(poster, str):
+        poster = strings["poster_hosts"][poster[0]] + poster[1]
+    full["poster"] = poster
+    full["category"] = entry["category"]
+    full["url"] = expand_url(entry["u"], strings)
+    if isinstance(entry["u"], str):
+        full.update({k: entry[k] for k in ("id", "ext") if k in entry})
+    else:
+        full["id"], full["ext"] = entry["u"][1], entry["u"][2]
+    if "attrs" in entry:
+        full["attrs"] = entry["attrs"]
+    if "alternates" in entry:
+        full["alternates"] = [expand_url(u, strings) for u in entry["alternates"]]
+    return full
+
+class ColumnarCatalog:
+    """
+    Reader for ColumnarWriter files: len(), row(i), column(name), iteration
+
+    Rows come back exactly as the row-oriented catalog has them: url is
+    rebuilt from url_dir + id + "." + ext (or its sparse copy), poster from
+    poster_dir + poster_file.
+    """
+
+    def __init__(self, filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("format") != COLUMNAR_FORMAT:
+            raise ValueError(f"{filepath}: expected {COLUMNAR_FORMAT}, got {data.get('format')}")
+        self.count = data["count"]
+        self.columns = data["columns"]
+        self.dictionaries = data["dictionaries"]
+        self.sparse = {field: dict(zip(s["rows"], s["values"])) for field, s in data["sparse"].items()}
+
+    def __len__(self):
+        return self.count
+
+    def column(self, field):
+        """Decoded values of one field for every row (None where absent)"""
+        if field in ("url", "poster"):
+            return [self.row(i).get(field) for i in range(self.count)]
+        if field in self.sparse:
+            values = self.sparse[field]
+            return [values.get(i) for i in range(self.count)]
+        values = self.columns[field]
+        codes = self.dictionaries.get(field)
+        if codes is None:
+            return values
+        return [None if v is None else codes[v] for v in values]
+
+    def _stored(self, i):
+        """Stored fields of row i, in column order (split fields kept even if None)"""
+        stored = {}
+        for field, values in self.columns.items():
+            value = values[i]
+            codes = self.dictionaries.get(field)
+            if value is not None and codes is not None:
+                value = codes[value]
+            if value is not None or field in ("url_dir", "poster_dir"):
+                stored[field] = value
+        for field, values in self.sparse.items():
+            if i in values:
+                stored[field] = values[i]
+        return stored
+
+    def row(self, i):
+        """Entry i as the row-oriented dict (absent fields omitted)"""
+        stored = self._stored(i)
+        entry = {}
+        for field, value in stored.items():
+            if field == "url_dir":
+                entry["url"] = stored.get("url") if value is None else f"{value}{stored['id']}.{stored['ext']}"
+            elif field == "poster_file":
+                entry["poster"] = (stored.get("poster_dir") or '') + value
+            elif field not in ("url", "poster_dir"):
+                entry[field] = value
+        return entry
+
+    def __iter__(self):
+        return (self.row(i) for i in range(self.count))
+
+def _load_shard(root, subdir, name, cache):
+    """{term: postings} of one shard ({} if there is none), read once per query"""
+    shard = cache.get((subdir, name))
+    if shard is None:
+        path = os.path.join(root, subdir, f"{name}.json")
+        shard = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                shard = json.load(f)
+        cache[(subdir, name)] = shard
+    return shard
+
+def _positions(postings, code):
+    position = 0
+    for delta in postings.get(code, ()):
+        position += delta
+        yield position
+
+def search_titles(output_dir, query, kind="movies"):
+    """
+    Positions in <kind>.json whose title has a word starting with every
+    query word (reads one shard per query word)
+    """
+    root = os.path.join(output_dir, "search")
+    code = KIND_CODES[kind]
+    cache = {}
+    result = None
+    for word in normalize_title(query).split():
+        if len(word) == 1:
+            # Word-start trigrams " <letter>?" all live in one trigram shard
+            prefix = " " + word
+            shard = _load_shard(root, "trigrams", shard_name(prefix), cache)
+        else:
+            prefix = word
+            shard = _load_shard(root, "tokens", shard_name(word), cache)
+        matches = set()
+        for term, postings in shard.items():
+            if term.startswith(prefix):
+                matches.update(_positions(postings, code))
+        result = matches if result is None else result & matches
+        if not result:
+            return []
+    return sorted(result) if result else []
+
+def search_similar(output_dir, query, kind="movies", min_share=0.5, limit=20):
+    """
+    Typo-tolerant search: positions in <kind>.json whose title shares at
+    least min_share of the query's trigrams, most shared first
+    """
+    root = os.path.join(output_dir, "search")
+    code = KIND_CODES[kind]
+    grams = title_trigrams(normalize_title(query))
+    if not grams:
+        return []
+    cache = {}
+    shared = defaultdict(int)
+    for gram in grams:
+        postings = _load_shard(root, "trigrams", shard_name(gram), cache).get(gram)
+        if postings:
+            for position in _positions(postings, code):
+                shared[position] += 1
+    needed = max(1, math.ceil(min_share * len(grams)))
+    ranked = sorted((p for p, n in shared.items() if n >= needed), key=lambda p: (-shared[p], p))
+    return ranked[:limit]
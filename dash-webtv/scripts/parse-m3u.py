@@ -4,146 +4,921 @@ M3U Parser for DASH WebTV
 Parses M3U playlist into structured JSON database
 """
 
+import argparse
+import hashlib
+import io
 import re
 import json
 import os
-from collections import defaultdict
+import shutil
+import tempfile
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import (COLUMNAR_FORMAT, KIND_CODES, load_strings, normalize_title, shard_name,
+                     title_trigrams)
 
 M3U_FILE = "/home/dash/screenshots/Playlists/m3u With Options - HLS.m3u"
 OUTPUT_DIR = "/home/dash/zion-github/dash-webtv/data"
 
-def parse_m3u(filepath):
-    """Parse M3U file and extract all entries"""
+# One scan picks up every key="value" attribute of an #EXTINF line
+ATTR_RE = re.compile(r' ([A-Za-z0-9_-]+)="([^"]*)"')
+
+# Parallel parsing splits the playlist into chunks of about this many bytes
+CHUNK_BYTES = 8 * 1024 * 1024
 
-    movies = []
-    series = []
-    live = []
-    categories = defaultdict(lambda: {"movies": [], "series": [], "live": []})
+def iter_pairs(lines):
+    """
+    Yield (extinf_line, url_line) pairs from an iterable of playlist lines.
+
+    Each #EXTINF line is paired with the next line that is not blank or a
+    #-directive (#EXTVLCOPT, #EXTGRP, ...); an #EXTINF without a URL before
+    the next #EXTINF is dropped.
+    """
+    extinf = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith('#EXTINF:'):
+            extinf = line
+        elif extinf is not None and line and not line.startswith('#'):
+            yield extinf, line
+            extinf = None
 
+def iter_m3u(filepath):
+    """Yield (extinf_line, url_line) pairs while reading the playlist line by line"""
     with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-        lines = f.readlines()
+        yield from iter_pairs(f)
 
-    print(f"Total lines: {len(lines)}")
+def parse_attributes(extinf):
+    """All key="value" attributes of an #EXTINF line (first occurrence wins)"""
+    attrs = {}
+    for key, value in ATTR_RE.findall(extinf):
+        attrs.setdefault(key, value)
+    return attrs
 
-    i = 0
-    count = 0
-    while i < len(lines):
-        line = lines[i].strip()
+def parse_stream_url(url):
+    """(stream id, extension) from the last path segment, e.g. .../12345.mkv -> ("12345", "mkv")"""
+    stem, dot, ext = url.rpartition('/')[2].rpartition('.')
+    if not dot or not ext.isascii() or not ext.isalnum():
+        return None, None
+    if stem.isascii() and stem.isdigit():
+        return stem, ext
+    return None, ext
 
-        if line.startswith('#EXTINF:'):
-            # Parse metadata line
-            # Format: #EXTINF:-1 tvg-id="" tvg-name="Title" tvg-logo="url" group-title="Category",Display Name
-
-            # Extract tvg-name
-            name_match = re.search(r'tvg-name="([^"]*)"', line)
-            name = name_match.group(1) if name_match else ""
-
-            # Extract tvg-logo (poster)
-            logo_match = re.search(r'tvg-logo="([^"]*)"', line)
-            poster = logo_match.group(1) if logo_match else ""
-
-            # Extract group-title (category)
-            group_match = re.search(r'group-title="([^"]*)"', line)
-            category = group_match.group(1) if group_match else "Uncategorized"
-
-            # Get URL from next line
-            if i + 1 < len(lines):
-                url = lines[i + 1].strip()
-
-                if url.startswith('http'):
-                    # Determine content type from URL
-                    entry = {
-                        "name": name,
-                        "poster": poster,
-                        "category": category,
-                        "url": url
-                    }
-
-                    # Extract stream ID from URL
-                    id_match = re.search(r'/(\d+)\.[a-zA-Z0-9]+$', url)
-                    if id_match:
-                        entry["id"] = id_match.group(1)
-
-                    # Extract extension
-                    ext_match = re.search(r'\.([a-zA-Z0-9]+)$', url)
-                    if ext_match:
-                        entry["ext"] = ext_match.group(1)
-
-                    # Categorize by content type
-                    if '/movie/' in url:
-                        movies.append(entry)
-                        categories[category]["movies"].append(len(movies) - 1)
-                    elif '/series/' in url:
-                        series.append(entry)
-                        categories[category]["series"].append(len(series) - 1)
-                    elif '/live/' in url:
-                        live.append(entry)
-                        categories[category]["live"].append(len(live) - 1)
-
-                    count += 1
-                    if count % 50000 == 0:
-                        print(f"Processed {count} entries...")
-
-                i += 2
+def parse_entry(extinf, url):
+    """(kind, entry) for one #EXTINF/URL pair, or None if it is not a movie/series/live stream"""
+    # Format: #EXTINF:-1 tvg-id="" tvg-name="Title" tvg-logo="url" group-title="Category",Display Name
+    if not url.startswith('http'):
+        return None
+
+    # Determine content type from URL
+    if '/movie/' in url:
+        kind = "movies"
+    elif '/series/' in url:
+        kind = "series"
+    elif '/live/' in url:
+        kind = "live"
+    else:
+        return None
+
+    attrs = parse_attributes(extinf)
+    entry = {
+        "name": attrs.pop("tvg-name", ""),
+        "poster": attrs.pop("tvg-logo", ""),
+        "category": attrs.pop("group-title", "Uncategorized"),
+        "url": url
+    }
+
+    stream_id, ext = parse_stream_url(url)
+    if stream_id is not None:
+        entry["id"] = stream_id
+    if ext is not None:
+        entry["ext"] = ext
+
+    # Provider extras (tvg-id, catchup, catchup-days, ...)
+    extra = {key: value for key, value in attrs.items() if value}
+    if extra:
+        entry["attrs"] = extra
+
+    return kind, entry
+
+def iter_entries(filepath):
+    """Stream (kind, entry) for every movie, series episode and live channel"""
+    for extinf, url in iter_m3u(filepath):
+        parsed = parse_entry(extinf, url)
+        if parsed is not None:
+            yield parsed
+
+def entry_record(kind, entry):
+    """(kind, category, key, entry JSON): what the writers need from a parsed entry"""
+    # Stream id identifies an entry across refreshes; URL if the provider gives none
+    key = entry.get("id") or entry["url"]
+    return kind, entry["category"], key, json.dumps(entry, ensure_ascii=False)
+
+def chunk_boundaries(filepath, chunk_bytes=CHUNK_BYTES):
+    """
+    Byte offsets splitting the playlist into ~chunk_bytes ranges, each
+    starting on an #EXTINF line so no entry straddles two chunks.
+    """
+    size = os.path.getsize(filepath)
+    bounds = [0]
+    with open(filepath, 'rb') as f:
+        target = chunk_bytes
+        while target < size:
+            f.seek(target)
+            pos = target
+            found = -1
+            while found < 0:
+                block = f.read(1024 * 1024)
+                if not block:
+                    break
+                # Overlap by the marker length so a split marker is still found
+                found = block.find(b'\n#EXTINF:')
+                if found < 0:
+                    pos += max(len(block) - 8, 1)
+                    f.seek(pos)
+            if found < 0:
+                break
+            start = pos + found + 1
+            if start > bounds[-1]:
+                bounds.append(start)
+            target = max(start, target) + chunk_bytes
+    bounds.append(size)
+    return bounds
+
+def parse_chunk(job):
+    """
+    Parse one byte range of the playlist in a worker process
+
+    Returns [entry_record()] in file order; entries are serialized here so
+    only strings travel back to the parent.
+    """
+    filepath, start, end = job
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Same newline handling as reading the file in text mode
+    lines = io.StringIO(data.decode('utf-8', errors='ignore'), newline=None)
+    out = []
+    for extinf, url in iter_pairs(lines):
+        parsed = parse_entry(extinf, url)
+        if parsed is not None:
+            out.append(entry_record(*parsed))
+    return out
+
+def iter_parsed(filepath, jobs=1):
+    """
+    entry_record() for every entry, in playlist order
+
+    jobs > 1 parses chunks in a process pool; at most 2 * jobs chunk
+    results are held at once, consumed strictly in order.
+    """
+    if jobs <= 1:
+        for kind, entry in iter_entries(filepath):
+            yield entry_record(kind, entry)
+        return
+
+    bounds = chunk_boundaries(filepath)
+    chunks = [(filepath, a, b) for a, b in zip(bounds, bounds[1:])]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        next_chunk = 0
+        while pending or next_chunk < len(chunks):
+            while next_chunk < len(chunks) and len(pending) < 2 * jobs:
+                pending.append(pool.submit(parse_chunk, chunks[next_chunk]))
+                next_chunk += 1
+            yield from pending.popleft().result()
+
+# "FR: Title", "|EN| Title", "[AR] Title" -> "Title" when matching across providers
+LANG_PREFIX_RE = re.compile(r'^\s*(?:[A-Z]{2,3}\s*[:|-]|\|[A-Z]{2,3}\||\[[A-Z]{2,3}\])\s*')
+YEAR_RE = re.compile(r'[(\[]((?:19|20)\d\d)[)\]]|\s-\s((?:19|20)\d\d)\s*$')
+
+def title_key(kind, name):
+    """
+    Dedup key for one title: (kind, normalized title without year, year)
+
+    Movies/series also drop a leading language tag; live channels keep it,
+    since "FR: TF1" and "BE: TF1" are different feeds.
+    """
+    year = None
+    match = YEAR_RE.search(name)
+    if match:
+        year = match.group(1) or match.group(2)
+        name = name[:match.start()] + name[match.end():]
+    if kind != "live":
+        name = LANG_PREFIX_RE.sub('', name)
+    return kind, normalize_title(name), year
+
+def provider_key(url, key):
+    """
+    Entry key qualified by its provider: a stream id only means something
+    within one server/account, so it is prefixed with the URL's directory
+    ("http://host/movie/user/pass/" + "12345"). URL keys are already global.
+    """
+    if key == url:
+        return key
+    return f"{url.rpartition('/')[0]}/{key}"
+
+class PlaylistMerger:
+    """
+    Deduplicate entry_record()s from several playlists by title_key()
+
+    The first occurrence is kept; the URLs of later duplicates become its
+    ordered "alternates" failover list. Keys are qualified with
+    provider_key(), so equal ids from different providers stay distinct
+    entries downstream (CatalogDelta, ...). Titles that normalize to nothing
+    are keyed by that provider key instead, so they are never merged by
+    accident.
+    Unique entries are spooled to a temporary file as they are first seen
+    (only their URL lists stay in memory), then yielded in first-seen order
+    once the playlists are exhausted.
+    """
+
+    def __init__(self):
+        self.unique = 0
+        self.duplicates = 0
+
+    def merge(self, records):
+        seen = {}
+        urls = []   # per unique entry, in first-seen order
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+            for kind, category, key, entry_json in records:
+                entry = json.loads(entry_json)
+                key = provider_key(entry["url"], key)
+                dedup_key = title_key(kind, entry["name"])
+                if not dedup_key[1]:
+                    dedup_key = (kind, key, None)
+                index = seen.get(dedup_key)
+                if index is None:
+                    seen[dedup_key] = len(urls)
+                    urls.append([entry["url"]])
+                    spool.write(json.dumps([kind, category, key, entry_json], ensure_ascii=False) + '\n')
+                    continue
+                if entry["url"] not in urls[index]:
+                    urls[index].append(entry["url"])
+                self.duplicates += 1
+            self.unique = len(urls)
+            del seen    # keys are not needed while replaying the spool
+
+            spool.seek(0)
+            for line, entry_urls in zip(spool, urls):
+                kind, category, key, entry_json = json.loads(line)
+                if len(entry_urls) > 1:
+                    entry = json.loads(entry_json)
+                    entry["alternates"] = entry_urls[1:]
+                    entry_json = json.dumps(entry, ensure_ascii=False)
+                yield kind, category, key, entry_json
+
+class UrlTemplater:
+    """
+    Factor repeated URL prefixes out of entries into a string table
+
+    A stream URL ".../movie/<user>/<pass>/12345.mkv" is stored as
+    "u": [template, "12345", "mkv"] with templates[template] =
+    ".../movie/<user>/<pass>/", and a poster as "p": [host, "/path.jpg"]
+    with poster_hosts[host] = "http://img.example.com". Alternates are
+    compacted the same way. URLs that do not fit stay as plain strings.
+    The table is written to strings.json; catalog.expand_entry() restores
+    an entry.
+
+    Seeded with the previous run's table, the table is append-only: an
+    index never changes meaning between refreshes, so reordering the
+    playlist does not touch unchanged entries, and a client holding an
+    older strings.json still expands the entries it knows correctly.
+    """
+
+    def __init__(self, previous=None):
+        previous = previous or {}
+        self.templates = {value: i for i, value in enumerate(previous.get("url_templates", []))}
+        self.poster_hosts = {value: i for i, value in enumerate(previous.get("poster_hosts", []))}
+
+    @classmethod
+    def from_dir(cls, output_dir):
+        """Templater continuing the strings.json already in output_dir, if any"""
+        if not os.path.exists(os.path.join(output_dir, "strings.json")):
+            return cls()
+        return cls(load_strings(output_dir))
+
+    @staticmethod
+    def _intern(table, value):
+        index = table.get(value)
+        if index is None:
+            index = table[value] = len(table)
+        return index
+
+    def compact_url(self, url):
+        prefix, _, tail = url.rpartition('/')
+        stream_id, ext = parse_stream_url(url)
+        if stream_id is None or tail != f"{stream_id}.{ext}":
+            return url
+        return [self._intern(self.templates, prefix + '/'), stream_id, ext]
+
+    def compact_poster(self, poster):
+        scheme, sep, rest = poster.partition('://')
+        if not sep:
+            return poster
+        host, slash, path = rest.partition('/')
+        return [self._intern(self.poster_hosts, f"{scheme}://{host}"), slash + path]
+
+    def compact(self, records):
+        """entry_record()s with url/poster/id/ext folded into "u"/"p" """
+        for kind, category, key, entry_json in records:
+            entry = json.loads(entry_json)
+            compact = {"name": entry["name"]}
+            if entry["poster"]:
+                compact["p"] = self.compact_poster(entry["poster"])
+            compact["category"] = entry["category"]
+            url = self.compact_url(entry["url"])
+            compact["u"] = url
+            if isinstance(url, str):
+                # Not templated: keep whatever id/ext could be parsed
+                for field in ("id", "ext"):
+                    if field in entry:
+                        compact[field] = entry[field]
+            if "attrs" in entry:
+                compact["attrs"] = entry["attrs"]
+            if "alternates" in entry:
+                compact["alternates"] = [self.compact_url(u) for u in entry["alternates"]]
+            yield kind, category, key, json.dumps(compact, ensure_ascii=False)
+
+    def save(self, output_dir):
+        save_json({"url_templates": list(self.templates),
+                   "poster_hosts": list(self.poster_hosts)}, "strings.json", output_dir)
+
+def parse_m3u(filepaths, writers, jobs=1, sinks=(), merger=None, templater=None):
+    """
+    Parse M3U file(s), handing each entry to writers[kind] as it is read
+
+    Only per-category counters are kept in memory (plus each unique title's
+    URL list when merging). Extra outputs (CatalogDelta, CategoryShards, ...) get
+    every entry_record() through sink.add(). Returns (counts, categories),
+    categories mapping each category to its {kind: count}.
+    """
+    if isinstance(filepaths, str):
+        filepaths = [filepaths]
+    counts = {"movies": 0, "series": 0, "live": 0}
+    categories = defaultdict(lambda: {"movies": 0, "series": 0, "live": 0})
+
+    records = (record for filepath in filepaths for record in iter_parsed(filepath, jobs))
+    if merger is not None:
+        records = merger.merge(records)
+    if templater is not None:
+        records = templater.compact(records)
+
+    total = 0
+    for kind, category, key, entry_json in records:
+        writers[kind].write_json(entry_json)
+        for sink in sinks:
+            sink.add(kind, category, key, entry_json)
+        categories[category][kind] += 1
+        counts[kind] += 1
+
+        total += 1
+        if total % 50000 == 0:
+            print(f"Processed {total} entries...")
+
+    return counts, dict(categories)
+
+class StagedWriter:
+    """
+    Base for the catalog writers: output goes to <filepath>.tmp and only
+    replaces filepath on close(), so a failed or interrupted refresh never
+    touches the published file. abort() throws the partial output away.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.tmp_path = filepath + ".tmp"
+        self.file = None
+
+    def _publish(self):
+        os.replace(self.tmp_path, self.filepath)
+        size = os.path.getsize(self.filepath) / (1024 * 1024)
+        print(f"Saved {self.filepath} ({size:.2f} MB)")
+
+    def abort(self):
+        if self.file is not None:
+            self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+class JsonArrayWriter(StagedWriter):
+    """Write a JSON array one item at a time (same bytes as json.dump of the list)"""
+
+    def __init__(self, filepath):
+        super().__init__(filepath)
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+        self.file.write('[')
+        self.count = 0
+
+    def write_json(self, text):
+        """Append one already-serialized item"""
+        if self.count:
+            self.file.write(', ')
+        self.file.write(text)
+        self.count += 1
+
+    def write(self, item):
+        self.write_json(json.dumps(item, ensure_ascii=False))
+
+    def close(self):
+        self.file.write(']')
+        self.file.close()
+        self._publish()
+
+class NdjsonWriter(StagedWriter):
+    """Write one JSON entry per line, so clients can read the catalog incrementally"""
+
+    def __init__(self, filepath):
+        super().__init__(filepath)
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def write_json(self, text):
+        """Append one already-serialized item (must not contain raw newlines)"""
+        self.file.write(text)
+        self.file.write('\n')
+        self.count += 1
+
+    def write(self, item):
+        self.write_json(json.dumps(item, ensure_ascii=False))
+
+    def close(self):
+        self.file.close()
+        self._publish()
+
+class ColumnarWriter(StagedWriter):
+    """
+    Struct-of-arrays catalog: one JSON array per field instead of one object per entry
+
+        {"format": "columnar-v2", "count": n,
+         "columns": {"name": [...], "poster_dir": [0, 0, ...], "poster_file": [...], ...},
+         "dictionaries": {"category": [...], "url_dir": [...], ...},
+         "sparse": {"attrs": {"rows": [...], "values": [...]}, ...}}
+
+    url is not stored: it is url_dir + id + "." + ext, and url_dir (the
+    server/credentials directory) is shared by thousands of rows. poster is
+    split the same way into poster_dir + poster_file. The directories,
+    category and ext are dictionary-encoded as small integers. attrs,
+    alternates and any url that does not end in "<id>.<ext>", present on
+    few rows, are stored sparsely. Columns are spooled to temporary files
+    while parsing and stitched together on close(), so memory stays
+    independent of catalog size. Read with catalog.ColumnarCatalog.
+    """
+
+    DICT_FIELDS = ("category", "ext", "url_dir", "poster_dir")
+    SPARSE_FIELDS = ("url", "attrs", "alternates")
+
+    def __init__(self, filepath):
+        super().__init__(filepath)
+        self.spool_dir = os.path.dirname(os.path.abspath(filepath))
+        self.columns = {}
+        self.dictionaries = {field: {} for field in self.DICT_FIELDS}
+        self.sparse = {}
+        self.count = 0
+
+    def _spool(self):
+        return tempfile.TemporaryFile('w+', encoding='utf-8', dir=self.spool_dir)
+
+    def write_json(self, text):
+        self.write(json.loads(text))
+
+    @staticmethod
+    def _split(item):
+        """Row with url and poster replaced by their stored parts"""
+        row = {}
+        for field, value in item.items():
+            if field == "url":
+                tail = f"/{item.get('id')}.{item.get('ext')}"
+                if "id" in item and "ext" in item and value.endswith(tail):
+                    row["url_dir"] = value[:-len(tail) + 1]
+                else:
+                    row["url_dir"] = None
+                    row["url"] = value
+            elif field == "poster":
+                head, slash, tail = value.rpartition('/')
+                row["poster_dir"] = head + slash if slash else None
+                row["poster_file"] = tail
             else:
-                i += 1
-        else:
-            i += 1
+                row[field] = value
+        return row
+
+    def write(self, item):
+        item = self._split(item)
+        for field in item:
+            if field not in self.columns and field not in self.SPARSE_FIELDS:
+                # New column: earlier rows did not have it
+                spool = self._spool()
+                spool.write(','.join(['null'] * self.count))
+                self.columns[field] = spool
+
+        sep = ',' if self.count else ''
+        for field, spool in self.columns.items():
+            value = item.get(field)
+            if field in self.dictionaries and value is not None:
+                codes = self.dictionaries[field]
+                value = codes.setdefault(value, len(codes))
+            spool.write(sep + json.dumps(value, ensure_ascii=False))
+
+        for field in self.SPARSE_FIELDS:
+            if field in item:
+                rows, values = self.sparse.get(field) or self.sparse.setdefault(
+                    field, (self._spool(), self._spool()))
+                rows.write(f"{',' if rows.tell() else ''}{self.count}")
+                values.write((',' if values.tell() else '') + json.dumps(item[field], ensure_ascii=False))
+        self.count += 1
+
+    def close(self):
+        def copy(spool, out):
+            spool.seek(0)
+            shutil.copyfileobj(spool, out)
+            spool.close()
+
+        with open(self.tmp_path, 'w', encoding='utf-8') as out:
+            out.write(f'{{"format":"{COLUMNAR_FORMAT}","count":{self.count},"columns":{{')
+            for i, (field, spool) in enumerate(self.columns.items()):
+                out.write(('' if i == 0 else ',') + json.dumps(field) + ':[')
+                copy(spool, out)
+                out.write(']')
+            out.write('},"dictionaries":')
+            out.write(json.dumps({field: list(codes) for field, codes in self.dictionaries.items()
+                                  if field in self.columns}, ensure_ascii=False, separators=(',', ':')))
+            out.write(',"sparse":{')
+            # entry key order, not first-seen order, so rows rebuild identically
+            present = [field for field in self.SPARSE_FIELDS if field in self.sparse]
+            for i, field in enumerate(present):
+                rows, values = self.sparse[field]
+                out.write(('' if i == 0 else ',') + json.dumps(field) + ':{"rows":[')
+                copy(rows, out)
+                out.write('],"values":[')
+                copy(values, out)
+                out.write(']}')
+            out.write('}}')
+        self._publish()
+
+    def abort(self):
+        for spool in self.columns.values():
+            spool.close()
+        for rows, values in self.sparse.values():
+            rows.close()
+            values.close()
+        super().abort()
+
+WRITERS = {
+    "json": (JsonArrayWriter, ".json"),
+    "ndjson": (NdjsonWriter, ".ndjson"),
+    "columnar": (ColumnarWriter, ".columns.json"),
+}
+
+class CatalogDelta:
+    """
+    Diff this run's entries against the previous catalog's hash index
+
+    The index (catalog_index.json) maps kind -> category -> key to a short
+    hash of the entry JSON, so a stream listed in two categories has two
+    identities that do not depend on playlist order. Entries are compared
+    as they stream past: new identities go to delta/added.json, ones whose
+    hash changed to delta/changed.json (both arrays of {"kind", "entry"}),
+    and identities not seen this run end up in delta/removed.json ({"kind",
+    "category", "key"}). A repeat of an identity within one run is ignored.
+    Without a previous index only the new index is written.
+    """
+
+    INDEX_FILE = "catalog_index.json"
+    INDEX_VERSION = 2
+
+    def __init__(self, output_dir):
+        self.index_path = os.path.join(output_dir, self.INDEX_FILE)
+        self.previous = None
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            # An index in an older layout is treated as missing
+            if index.get("version") == self.INDEX_VERSION:
+                self.previous = index["entries"]
+        self.current = defaultdict(lambda: defaultdict(dict))
+        self.writers = {}
+        if self.previous is not None:
+            delta_dir = os.path.join(output_dir, "delta")
+            os.makedirs(delta_dir, exist_ok=True)
+            self.writers = {name: JsonArrayWriter(os.path.join(delta_dir, f"{name}.json"))
+                            for name in ("added", "changed", "removed")}
+
+    def add(self, kind, category, key, entry_json):
+        seen = self.current[kind][category]
+        if key in seen:
+            return
+        digest = hashlib.blake2b(entry_json.encode('utf-8'), digest_size=8).hexdigest()
+        seen[key] = digest
+
+        if self.previous is None:
+            return
+        old = self.previous.get(kind, {}).get(category, {}).pop(key, None)
+        if old is None:
+            self.writers["added"].write_json(f'{{"kind": "{kind}", "entry": {entry_json}}}')
+        elif old != digest:
+            self.writers["changed"].write_json(f'{{"kind": "{kind}", "entry": {entry_json}}}')
 
-    return movies, series, live, dict(categories)
+    def close(self):
+        """Write removed.json and the new index; returns {added, changed, removed} counts or None"""
+        counts = None
+        if self.previous is not None:
+            for kind, by_category in self.previous.items():
+                for category, keys in by_category.items():
+                    for key in keys:
+                        self.writers["removed"].write({"kind": kind, "category": category, "key": key})
+            counts = {name: writer.count for name, writer in self.writers.items()}
+            for writer in self.writers.values():
+                writer.close()
 
-def save_json(data, filename):
-    """Save data to JSON file"""
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.INDEX_VERSION, "entries": self.current}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+        return counts
+
+    def abort(self):
+        """Drop this run's delta; the previous index and delta files stay as they were"""
+        for writer in self.writers.values():
+            writer.abort()
+
+def swap_dir(build_dir, target):
+    """Replace directory target with build_dir (the old one is only deleted once the new one is in place)"""
+    old_dir = target + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(target):
+        os.replace(target, old_dir)
+    os.replace(build_dir, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+class CategoryShards:
+    """
+    Per-category, paginated copies of the catalog for lazy client loading
+
+    Each (kind, category) gets pages of page_size entries under
+    shards/<kind>/<category slug>/<n>.json, written as soon as a page
+    fills, so memory is one partial page per category. shards/manifest.json
+    lists every category's counts and page URLs (relative to the output
+    directory). Pages are built in shards.tmp/ and swapped in by close(),
+    so clients keep the previous run's shards until the new set is done.
+    """
+
+    def __init__(self, output_dir, page_size=100):
+        self.root = os.path.join(output_dir, "shards")
+        self.build_dir = self.root + ".tmp"
+        self.page_size = page_size
+        # Leftovers of an interrupted run
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+        self.pending = {}
+        self.manifest = defaultdict(dict)
+
+    @staticmethod
+    def slug(category):
+        """File-safe, collision-free directory name for a category"""
+        base = re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-')[:40] or "category"
+        digest = hashlib.blake2b(category.encode('utf-8'), digest_size=4).hexdigest()
+        return f"{base}-{digest}"
+
+    def add(self, kind, category, key, entry_json):
+        page = self.pending.setdefault((kind, category), [])
+        page.append(entry_json)
+        if len(page) >= self.page_size:
+            self._flush(kind, category)
+
+    def _flush(self, kind, category):
+        page = self.pending.pop((kind, category), None)
+        if not page:
+            return
+        info = self.manifest[category].setdefault(kind, {"count": 0, "pages": []})
+        rel_dir = f"{kind}/{self.slug(category)}"
+        os.makedirs(os.path.join(self.build_dir, rel_dir), exist_ok=True)
+        rel_path = f"{rel_dir}/{len(info['pages'])}.json"
+        with open(os.path.join(self.build_dir, rel_path), 'w', encoding='utf-8') as f:
+            f.write('[' + ', '.join(page) + ']')
+        info["count"] += len(page)
+        info["pages"].append(f"shards/{rel_path}")
+
+    def close(self):
+        """Flush partial pages and write the manifest; returns the number of pages"""
+        for kind, category in list(self.pending):
+            self._flush(kind, category)
+        os.makedirs(self.build_dir, exist_ok=True)
+        manifest = {"page_size": self.page_size, "categories": self.manifest}
+        with open(os.path.join(self.build_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        swap_dir(self.build_dir, self.root)
+        return sum(len(info["pages"]) for kinds in self.manifest.values() for info in kinds.values())
+
+    def abort(self):
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+
+def _delta_encode(values):
+    out = []
+    prev = 0
+    for value in values:
+        out.append(value - prev)
+        prev = value
+    return out
+
+class SearchIndex:
+    """
+    Title search index built while parsing
+
+    Two inverted indexes over normalize_title(name):
+        search/tokens/<ab>.json    word -> postings, one shard per 2-char prefix
+        search/trigrams/<ab>.json  trigram -> postings, sharded the same way
+    Postings are {"m"|"s"|"l": [...]} of positions in movies/series/live.json,
+    delta-encoded (first value absolute). catalog.search_titles()
+    (type-ahead) loads one shard per query word: the token shard of its
+    first two characters, or for a 1-letter word the word-start trigram
+    shard " <letter>". catalog.search_similar() (typo-tolerant) loads the
+    shard of each query trigram.
+    search/manifest.json lists the shards. The index is written to
+    search.tmp/ and swapped in by close().
+    """
+
+    def __init__(self, output_dir):
+        self.root = os.path.join(output_dir, "search")
+        self.build_dir = self.root + ".tmp"
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+        self.positions = {"movies": 0, "series": 0, "live": 0}
+        self.tokens = defaultdict(lambda: defaultdict(list))
+        self.trigrams = defaultdict(lambda: defaultdict(list))
+
+    def add(self, kind, category, key, entry_json):
+        position = self.positions[kind]
+        self.positions[kind] += 1
+        name = json.loads(entry_json)["name"]
+        normalized = normalize_title(name)
+        code = KIND_CODES[kind]
+        for token in set(normalized.split()):
+            self.tokens[token][code].append(position)
+        for gram in title_trigrams(normalized):
+            self.trigrams[gram][code].append(position)
+
+    def _write(self, subdir, index):
+        shards = defaultdict(dict)
+        for term, postings in sorted(index.items()):
+            shards[shard_name(term)][term] = {code: _delta_encode(p) for code, p in postings.items()}
+        os.makedirs(os.path.join(self.build_dir, subdir), exist_ok=True)
+        for name, terms in shards.items():
+            with open(os.path.join(self.build_dir, subdir, f"{name}.json"), 'w', encoding='utf-8') as f:
+                f.write(json.dumps(terms, ensure_ascii=False, separators=(',', ':')))
+        return {name: len(terms) for name, terms in sorted(shards.items())}
+
+    def close(self):
+        """Write every shard and the manifest; returns (tokens, trigrams) term counts"""
+        manifest = {
+            "normalization": "casefold, NFKD with combining marks stripped, non-word chars -> space",
+            "kinds": KIND_CODES,
+            "tokens": self._write("tokens", self.tokens),
+            "trigrams": self._write("trigrams", self.trigrams),
+        }
+        with open(os.path.join(self.build_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        swap_dir(self.build_dir, self.root)
+        return len(self.tokens), len(self.trigrams)
+
+    def abort(self):
+        shutil.rmtree(self.build_dir, ignore_errors=True)
+
+def save_json(data, filename, output_dir=OUTPUT_DIR):
+    """Save data to JSON file (written to a .tmp file, then renamed over the old one)"""
+    filepath = os.path.join(output_dir, filename)
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, filepath)
 
     size = os.path.getsize(filepath) / (1024 * 1024)
     print(f"Saved {filepath} ({size:.2f} MB)")
 
+def positive_int(text):
+    """argparse type: an integer >= 1"""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {text}")
+    return value
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parse an M3U playlist into the WebTV JSON catalog")
+    parser.add_argument('playlists', nargs='*', default=[M3U_FILE],
+                        help='M3U playlist(s); several are merged, deduplicated by title + year, '
+                             'with failover URLs. Merging keeps every unique title\'s URLs in memory '
+                             f'and spools entries to a temporary file (default: {M3U_FILE})')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                        help=f'catalog directory (default: {OUTPUT_DIR})')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='json',
+                        help='catalog files as JSON arrays (movies.json, ...), newline-delimited '
+                             'JSON (movies.ndjson, ...) or columnar arrays (movies.columns.json, '
+                             '...) (default: json)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='diff against the previous run (catalog_index.json) and write '
+                             'delta/added.json, delta/changed.json, delta/removed.json')
+    parser.add_argument('--shards', action='store_true',
+                        help='also write per-category pages under shards/ with shards/manifest.json')
+    parser.add_argument('--page-size', type=positive_int, default=100,
+                        help='entries per shard page (default: 100)')
+    parser.add_argument('--search-index', action='store_true',
+                        help='also write a sharded title search index under search/')
+    parser.add_argument('--compact-urls', action='store_true',
+                        help='store stream/poster URLs as string-table references (strings.json); '
+                             'see catalog.expand_entry()')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='worker processes for chunked parsing (0 = one per CPU; default: 1)')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    output_dir = args.output_dir
+    jobs = args.jobs or os.cpu_count() or 1
+
     print("=" * 50)
     print("DASH WebTV - M3U Parser")
     print("=" * 50)
 
     # Create output directory
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
 
-    # Parse M3U
-    print(f"\nParsing: {M3U_FILE}")
-    movies, series, live, categories = parse_m3u(M3U_FILE)
+    # Parse M3U, streaming entries straight into the output files
+    merger = PlaylistMerger() if len(args.playlists) > 1 else None
+    templater = UrlTemplater.from_dir(output_dir) if args.compact_urls else None
+    for playlist in args.playlists:
+        print(f"\nParsing: {playlist}" + (f" ({jobs} workers)" if jobs > 1 else ""))
+    writer_class, suffix = WRITERS[args.format]
+    writers = {kind: writer_class(os.path.join(output_dir, kind + suffix))
+               for kind in ("movies", "series", "live")}
+    delta = CatalogDelta(output_dir) if args.incremental else None
+    shards = CategoryShards(output_dir, args.page_size) if args.shards else None
+    search = SearchIndex(output_dir) if args.search_index else None
+    sinks = [sink for sink in (delta, shards, search) if sink is not None]
+    try:
+        counts, categories = parse_m3u(args.playlists, writers, jobs, sinks, merger, templater)
+    except BaseException:
+        # Leave the published catalog as it was
+        for output in [*writers.values(), *sinks]:
+            output.abort()
+        raise
+    print(f"\n=== SAVING FILES ===")
+    try:
+        # The string table only grows, so publishing it first keeps the old
+        # catalog files valid until the new ones replace them
+        if templater is not None:
+            templater.save(output_dir)
+        for writer in writers.values():
+            writer.close()
+        if shards is not None:
+            pages = shards.close()
+            print(f"Saved {pages} shard pages + {os.path.join(shards.root, 'manifest.json')}")
+        if search is not None:
+            tokens, trigrams = search.close()
+            print(f"Saved search index: {tokens} words, {trigrams} trigrams -> {search.root}")
+    except BaseException:
+        if delta is not None:
+            delta.abort()
+        raise
+    # The index only advances once everything else of this refresh is published
+    delta_counts = delta.close() if delta is not None else None
 
     print(f"\n=== RESULTS ===")
-    print(f"Movies: {len(movies)}")
-    print(f"Series Episodes: {len(series)}")
-    print(f"Live Channels: {len(live)}")
+    print(f"Movies: {counts['movies']}")
+    print(f"Series Episodes: {counts['series']}")
+    print(f"Live Channels: {counts['live']}")
     print(f"Categories: {len(categories)}")
-
-    # Save individual files
-    print(f"\n=== SAVING FILES ===")
-    save_json(movies, "movies.json")
-    save_json(series, "series.json")
-    save_json(live, "live.json")
+    if merger is not None:
+        print(f"Merged {len(args.playlists)} playlists: {merger.duplicates} "
+              f"duplicates folded into failover URLs")
+    if delta_counts is not None:
+        print(f"Changes since last run: {delta_counts['added']} added, "
+              f"{delta_counts['changed']} changed, {delta_counts['removed']} removed")
+    elif delta is not None:
+        print("No previous catalog index; wrote a fresh one")
 
     # Save category index
     category_index = {}
     for cat, data in categories.items():
         category_index[cat] = {
-            "movies_count": len(data["movies"]),
-            "series_count": len(data["series"]),
-            "live_count": len(data["live"])
+            "movies_count": data["movies"],
+            "series_count": data["series"],
+            "live_count": data["live"]
         }
-    save_json(category_index, "categories.json")
+    save_json(category_index, "categories.json", output_dir)
 
     # Save summary
     summary = {
-        "total_movies": len(movies),
-        "total_series": len(series),
-        "total_live": len(live),
+        "total_movies": counts["movies"],
+        "total_series": counts["series"],
+        "total_live": counts["live"],
         "total_categories": len(categories),
         "generated": "2025-11-26"
     }
-    save_json(summary, "summary.json")
+    if merger is not None:
+        summary["playlists"] = len(args.playlists)
+        summary["merged_duplicates"] = merger.duplicates
+    if delta_counts is not None:
+        summary["delta"] = delta_counts
+    save_json(summary, "summary.json", output_dir)
 
     # Print top categories
     print(f"\n=== TOP CATEGORIES ===")
@@ -155,7 +930,7 @@ def main():
         print(f"  {cat}: {total} items")
 
     print(f"\n=== DONE ===")
-    print(f"Files saved to: {OUTPUT_DIR}")
+    print(f"Files saved to: {output_dir}")
 
 if __name__ == "__main__":
     main()
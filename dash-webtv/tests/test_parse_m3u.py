@@ -0,0 +1,261 @@
+"""
+Tests for scripts/parse-m3u.py and the scripts/catalog.py readers.
+
+Run with: python -m unittest discover dash-webtv/tests
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+sys.path.insert(0, SCRIPTS)
+
+import catalog
+
+# parse-m3u.py is a script, not an importable module name
+spec = importlib.util.spec_from_file_location('parse_m3u', os.path.join(SCRIPTS, 'parse-m3u.py'))
+parse_m3u = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(parse_m3u)
+
+def record(name, stream_id, host='a.example', category='Films'):
+    extinf = f'#EXTINF:-1 tvg-name="{name}" group-title="{category}",{name}'
+    url = f'http://{host}/movie/user/pass/{stream_id}.mkv'
+    return parse_m3u.entry_record(*parse_m3u.parse_entry(extinf, url))
+
+def write_playlist(directory, name, lines, newline='\n'):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(newline.join(lines) + newline)
+    return path
+
+def playlist_lines(count):
+    lines = ['#EXTM3U']
+    kinds = ('movie', 'series', 'live')
+    for i in range(count):
+        lines.append(f'#EXTINF:-1 tvg-id="ch{i}" tvg-name="Title {i}" tvg-logo="http://img.example/{i}.jpg" '
+                     f'group-title="Group {i % 7}",Title {i}')
+        if i % 5 == 0:
+            lines.append('#EXTVLCOPT:http-user-agent=Player/1.0')
+        lines.append(f'http://a.example/{kinds[i % 3]}/user/pass/{i}.mkv')
+    return lines
+
+def merge(records):
+    merger = parse_m3u.PlaylistMerger()
+    merged = [json.loads(entry_json) for _, _, _, entry_json in merger.merge(records)]
+    return merger, merged
+
+class PlaylistMergerTest(unittest.TestCase):
+
+    def test_distinct_non_latin_titles_are_not_merged(self):
+        first = [record('فيلم الرسالة', 1), record('مسلسل باب الحارة', 2)]
+        second = [record('Аватар', 3, 'b.example'), record('Титаник', 4, 'b.example')]
+        merger, merged = merge(first + second)
+
+        self.assertEqual([e['name'] for e in merged],
+                         ['فيلم الرسالة', 'مسلسل باب الحارة', 'Аватар', 'Титаник'])
+        self.assertTrue(all('alternates' not in e for e in merged))
+        self.assertEqual(merger.duplicates, 0)
+
+    def test_same_non_latin_title_is_merged(self):
+        merger, merged = merge([record('[AR] فيلم الرسالة (1976)', 1),
+                                record('فيلم الرسالة (1976)', 9, 'b.example')])
+
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]['alternates'], ['http://b.example/movie/user/pass/9.mkv'])
+        self.assertEqual(merger.duplicates, 1)
+
+    def test_titles_without_letters_fall_back_to_the_provider_stream(self):
+        merger, merged = merge([record('???', 1), record('!!!', 2), record('???', 1, 'b.example'),
+                                record('???', 1)])
+
+        self.assertEqual([(e['name'], e['url']) for e in merged], [
+            ('???', 'http://a.example/movie/user/pass/1.mkv'),
+            ('!!!', 'http://a.example/movie/user/pass/2.mkv'),
+            ('???', 'http://b.example/movie/user/pass/1.mkv'),
+        ])
+        self.assertTrue(all('alternates' not in e for e in merged))
+        self.assertEqual(merger.duplicates, 1)
+
+    def test_keys_are_qualified_by_provider(self):
+        merged = list(parse_m3u.PlaylistMerger().merge([record('Alien (1979)', 5),
+                                                        record('Heat (1995)', 5, 'b.example')]))
+        self.assertEqual([key for _, _, key, _ in merged],
+                         ['http://a.example/movie/user/pass/5', 'http://b.example/movie/user/pass/5'])
+
+class UrlTemplaterTest(unittest.TestCase):
+
+    def live_record(self, stream_id):
+        extinf = f'#EXTINF:-1 tvg-name="Channel {stream_id}" group-title="Live",Channel'
+        return parse_m3u.entry_record(*parse_m3u.parse_entry(
+            extinf, f'http://a.example/live/user/pass/{stream_id}.ts'))
+
+    def test_table_is_append_only_across_runs(self):
+        movie, live = record('Alien', 1), self.live_record(2)
+        first = parse_m3u.UrlTemplater()
+        first_run = list(first.compact([movie, live]))
+        strings = {"url_templates": list(first.templates), "poster_hosts": list(first.poster_hosts)}
+
+        second = parse_m3u.UrlTemplater(strings)
+        second_run = list(second.compact([live, movie, record('Heat', 3, 'b.example')]))
+
+        self.assertEqual(second_run[:2], first_run[::-1])
+        self.assertEqual(list(second.templates)[:2], strings["url_templates"])
+        new_strings = {"url_templates": list(second.templates), "poster_hosts": list(second.poster_hosts)}
+        for (_, _, _, compact), (_, _, _, full) in zip(second_run, [live, movie]):
+            self.assertEqual(catalog.expand_entry(json.loads(compact), strings), json.loads(full))
+            self.assertEqual(catalog.expand_entry(json.loads(compact), new_strings), json.loads(full))
+
+class ColumnarCatalogTest(unittest.TestCase):
+
+    def test_round_trip_matches_row_json(self):
+        entries = [
+            {"name": "Alien", "poster": "http://img.example/t/p/1.jpg", "category": "Films",
+             "url": "http://a.example/movie/user/pass/1.mkv", "id": "1", "ext": "mkv"},
+            {"name": "Heat", "poster": "", "category": "Films",
+             "url": "http://a.example/movie/user/pass/2.mp4", "id": "2", "ext": "mp4",
+             "alternates": ["http://b.example/movie/user/pass/9.mp4"]},
+            {"name": "Odd", "poster": "logo.png", "category": "Other",
+             "url": "http://c.example/movie/play?id=3", "ext": "x", "attrs": {"tvg-id": "odd"}},
+            {"name": "TF1", "poster": "http://img.example/t/p/4.jpg", "category": "Live",
+             "url": "http://a.example/live/user/pass/4.ts", "id": "4", "ext": "ts"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'movies.columns.json')
+            writer = parse_m3u.ColumnarWriter(path)
+            for entry in entries:
+                writer.write(entry)
+            writer.close()
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            reader = catalog.ColumnarCatalog(path)
+
+        self.assertNotIn("url", data["columns"])
+        self.assertEqual(data["dictionaries"]["url_dir"],
+                         ["http://a.example/movie/user/pass/", "http://a.example/live/user/pass/"])
+        self.assertEqual(list(reader), entries)
+        self.assertEqual(reader.column("url"), [e["url"] for e in entries])
+
+class ChunkedParseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def assert_chunks_match_serial(self, path):
+        serial = list(parse_m3u.iter_parsed(path, 1))
+        self.assertTrue(serial)
+        for chunk_bytes in (1, 64, 300, 4096, 1 << 20):
+            bounds = parse_m3u.chunk_boundaries(path, chunk_bytes)
+            if chunk_bytes < 4096:
+                self.assertGreater(len(bounds), 2)
+            chunked = []
+            for start, end in zip(bounds, bounds[1:]):
+                chunked.extend(parse_m3u.parse_chunk((path, start, end)))
+            self.assertEqual(chunked, serial, f"chunk_bytes={chunk_bytes}")
+
+    def test_chunks_match_serial_parse(self):
+        self.assert_chunks_match_serial(write_playlist(self.tmp.name, 'lf.m3u', playlist_lines(120)))
+
+    def test_chunks_match_serial_parse_with_crlf(self):
+        self.assert_chunks_match_serial(
+            write_playlist(self.tmp.name, 'crlf.m3u', playlist_lines(120), newline='\r\n'))
+
+    def test_option_line_between_extinf_and_url_keeps_the_entry(self):
+        path = write_playlist(self.tmp.name, 'opt.m3u', playlist_lines(6))
+        names = [json.loads(entry_json)['name'] for _, _, _, entry_json in parse_m3u.iter_parsed(path, 1)]
+        self.assertEqual(names, [f'Title {i}' for i in range(6)])
+
+class CatalogDeltaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def refresh(self, records):
+        """One --incremental run: (counts, {added, changed, removed: [...]})"""
+        delta = parse_m3u.CatalogDelta(self.tmp.name)
+        for rec in records:
+            delta.add(*rec)
+        counts = delta.close()
+        if counts is None:
+            return None, None
+        files = {}
+        for name in ('added', 'changed', 'removed'):
+            with open(os.path.join(self.tmp.name, 'delta', f'{name}.json'), encoding='utf-8') as f:
+                files[name] = json.load(f)
+        return counts, files
+
+    def test_first_run_writes_only_the_index(self):
+        counts, _ = self.refresh([record('Alien', 1)])
+        self.assertIsNone(counts)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, 'catalog_index.json')))
+
+    def test_added_changed_removed(self):
+        self.refresh([record('Alien', 1), record('Heat', 2), record('Ronin', 3)])
+        counts, files = self.refresh([record('Alien', 1), record('Heat (Remastered)', 2), record('Solaris', 4)])
+
+        self.assertEqual(counts, {'added': 1, 'changed': 1, 'removed': 1})
+        self.assertEqual([d['entry']['name'] for d in files['added']], ['Solaris'])
+        self.assertEqual([d['entry']['name'] for d in files['changed']], ['Heat (Remastered)'])
+        self.assertEqual(files['removed'], [{'kind': 'movies', 'category': 'Films', 'key': '3'}])
+
+    def test_reordered_playlist_is_unchanged(self):
+        records = [record('Alien', 1), record('Heat', 2), record('Alien', 1, category='Sci-Fi')]
+        self.refresh(records)
+        counts, _ = self.refresh(records[::-1])
+        self.assertEqual(counts, {'added': 0, 'changed': 0, 'removed': 0})
+
+    def test_merged_playlists_keep_same_ids_from_different_providers(self):
+        def playlists(*extra):
+            return parse_m3u.PlaylistMerger().merge(
+                [record('Alien (1979)', 5), record('Heat (1995)', 5, 'b.example'), *extra])
+
+        self.refresh(playlists())
+        counts, files = self.refresh(playlists(record('Heat 2', 6, 'b.example')))
+
+        self.assertEqual(counts, {'added': 1, 'changed': 0, 'removed': 0})
+        self.assertEqual([d['entry']['name'] for d in files['added']], ['Heat 2'])
+
+    def test_stream_in_two_categories_has_two_identities(self):
+        self.refresh([record('Alien', 1), record('Alien', 1, category='Sci-Fi')])
+        counts, files = self.refresh([record('Alien', 1, category='Sci-Fi')])
+
+        self.assertEqual(counts, {'added': 0, 'changed': 0, 'removed': 1})
+        self.assertEqual(files['removed'], [{'kind': 'movies', 'category': 'Films', 'key': '1'}])
+
+class SearchIndexTest(unittest.TestCase):
+
+    TITLES = ['The Matrix', 'Matrix Reloaded', 'Alien', 'Aliens', 'فيلم الرسالة', 'Титаник']
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        index = parse_m3u.SearchIndex(self.tmp.name)
+        for i, title in enumerate(self.TITLES):
+            index.add(*record(title, i))
+        index.close()
+
+    def test_prefix_search(self):
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'matr'), [0, 1])
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'alien'), [2, 3])
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'matrix rel'), [1])
+
+    def test_one_letter_word_uses_the_trigram_shard(self):
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'm'), [0, 1])
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'a'), [2, 3])
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'т'), [5])
+
+    def test_non_latin_titles_are_searchable(self):
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'فيلم'), [4])
+        self.assertEqual(catalog.search_titles(self.tmp.name, 'тита'), [5])
+
+    def test_similar_search_tolerates_typos(self):
+        self.assertEqual(catalog.search_similar(self.tmp.name, 'matrik')[:2], [0, 1])
+        self.assertEqual(catalog.search_similar(self.tmp.name, 'тетаник'), [5])
+
+if __name__ == '__main__':
+    unittest.main()
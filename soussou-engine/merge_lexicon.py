@@ -5,12 +5,16 @@ Merges all agent extractions into a single master lexicon.
 """
 
 import json
+import sys
 import unicodedata
 import re
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from lexicon_io import atomic_write_json, atomic_write_text, file_lock
+
 # Paths
 RAW_DIR = Path("/home/user/ZION/soussou-engine/raw")
 DATA_DIR = Path("/home/user/ZION/soussou-engine/data")
@@ -774,10 +778,10 @@ def main():
     for idx, entry in enumerate(lexicon):
         entry["id"] = f"sus_{idx+1:05d}"
 
-    # Save lexicon
+    # Save lexicon (atomic replace, serialized with other lexicon writers)
     lexicon_path = DATA_DIR / "lexicon.json"
-    with open(lexicon_path, 'w', encoding='utf-8') as f:
-        json.dump(lexicon, f, ensure_ascii=False, indent=2)
+    with file_lock(lexicon_path):
+        atomic_write_json(lexicon_path, lexicon, indent=2)
 
     print(f"\nSaved lexicon to {lexicon_path}")
 
@@ -861,8 +865,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
     # Save statistics
     stats_path = DATA_DIR / "stats.md"
-    with open(stats_path, 'w', encoding='utf-8') as f:
-        f.write(stats)
+    atomic_write_text(stats_path, stats)
 
     print(f"Saved statistics to {stats_path}")
     print("\nMerge complete!")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Character n-gram language model over corpus word forms (Kneser-Ney).
+
+Gives an offline plausibility score for a spelling - "does this look like
+Soussou as written in the Bible?" - for variant detection and spell
+checking, without a network call or a large model:
+
+    lm = CharLanguageModel.load('char_lm.npz')
+    lm.score(['fala', 'falaxi', 'qwzx'])    # mean log10 P per character
+
+Each word is modelled as "^" + word + "$". Training uses every corpus
+token (word types weighted by frequency) with interpolated Kneser-Ney:
+one discount per order, D = n1 / (n1 + 2 n2), raw counts for the highest
+order and for grams starting at "^", continuation counts below. The interpolated model is then stored in backoff form,
+
+    P(c | h) = p(hc)                     if hc was seen
+             = bow(h) * P(c | h[1:])     otherwise (bow = 1 if h unseen)
+
+so scoring a character is at most `order` table lookups.
+
+Tables (char_lm.npz) are array-backed: per order, sorted int64 keys (the
+gram's character ids in base len(alphabet) + 1), and log10 p / log10 bow
+quantized to uint8 codes into 256-entry float32 codebooks (quantile bins).
+Scoring a batch encodes every position of every string at once and
+resolves all lookups with np.searchsorted.
+
+Usage:
+    python char_lm.py char_lm.npz fala falaxi qwzx
+"""
+
+import sys
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from corpus import normalize_token
+
+BOW = '^'
+EOW = '$'
+LEVELS = 256
+
+def _discount(counts):
+    """Single KN discount from the count-of-counts of one order."""
+    n1 = sum(1 for c in counts.values() if c == 1)
+    n2 = sum(1 for c in counts.values() if c == 2)
+    if n1 == 0 or n2 == 0:
+        return 0.5
+    return min(max(n1 / (n1 + 2 * n2), 0.1), 0.9)
+
+def _quantize(values):
+    """float array -> (uint8 codes, float32 codebook) using quantile bins."""
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.float32)
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, LEVELS + 1)))
+    codes = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, max(len(edges) - 2, 0))
+    codebook = np.zeros(max(len(edges) - 1, 1), dtype=np.float32)
+    sums = np.bincount(codes, weights=values, minlength=len(codebook))
+    sizes = np.bincount(codes, minlength=len(codebook))
+    np.divide(sums, sizes, out=codebook, where=sizes > 0, casting='unsafe')
+    return codes.astype(np.uint8), codebook
+
+def train_char_lm(word_counts, order=5):
+    """
+    word_counts: {word: corpus frequency}. Returns the arrays for
+    save_char_lm()/CharLanguageModel.
+    """
+    alphabet = sorted({c for w in word_counts for c in w} | {EOW})
+    base = len(alphabet) + 1            # id 0 is reserved for unknown characters
+
+    # Raw counts of every gram of length 1..order that predicts a real char
+    raw = [None] + [Counter() for _ in range(order)]
+    for word, freq in word_counts.items():
+        s = BOW + word + EOW
+        for i in range(1, len(s)):
+            for k in range(1, min(order, i + 1) + 1):
+                raw[k][s[i - k + 1:i + 1]] += freq
+
+    # Adjusted counts: continuation counts except at the top order / after "^"
+    adjusted = [None] + [None] * order
+    adjusted[order] = raw[order]
+    for k in range(order - 1, 0, -1):
+        adj = Counter()
+        for gram in raw[k + 1]:
+            adj[gram[1:]] += 1
+        for gram, count in raw[k].items():
+            if gram[0] == BOW:
+                adj[gram] = count
+        adjusted[k] = adj
+
+    # Per-context totals and number of distinct continuations
+    context_total = [None] + [defaultdict(int) for _ in range(order)]
+    context_types = [None] + [defaultdict(int) for _ in range(order)]
+    for k in range(1, order + 1):
+        for gram, count in adjusted[k].items():
+            context_total[k][gram[:-1]] += count
+            context_types[k][gram[:-1]] += 1
+    discounts = [None] + [_discount(adjusted[k]) for k in range(1, order + 1)]
+
+    # Interpolated probabilities, lowest order first
+    uniform = 1.0 / base
+    prob = [None] + [{} for _ in range(order)]
+    for k in range(1, order + 1):
+        d = discounts[k]
+        for gram, count in adjusted[k].items():
+            h = gram[:-1]
+            total = context_total[k][h]
+            gamma = d * context_types[k][h] / total
+            lower = prob[k - 1][gram[1:]] if k > 1 else uniform
+            prob[k][gram] = max(count - d, 0) / total + gamma * lower
+
+    # Backoff weight of each context h (stored on the gram h of order len(h))
+    backoff = [None] + [{} for _ in range(order)]
+    for k in range(2, order + 1):
+        d = discounts[k]
+        for h, total in context_total[k].items():
+            backoff[k - 1][h] = d * context_types[k][h] / total
+
+    char_ids = {c: i + 1 for i, c in enumerate(alphabet)}
+    char_ids[BOW] = len(alphabet) + 1   # only ever appears in contexts
+    base += 1
+
+    arrays = {
+        'alphabet': np.array(alphabet + [BOW]),
+        'order': np.array(order),
+        'base': np.array(base),
+        'unk_log10': np.array(np.log10(uniform), dtype=np.float32),
+    }
+    for k in range(1, order + 1):
+        # Contexts that are never predicted themselves ("^") still need a row
+        grams = list(prob[k]) + [h for h in backoff[k] if h not in prob[k]]
+        keys = np.array([_encode(g, char_ids, base) for g in grams], dtype=np.int64)
+        logp = np.log10(np.array([prob[k][g] for g in grams if g in prob[k]]))
+        logp = np.concatenate((logp, np.full(len(grams) - len(logp), logp.min())))
+        bow = np.log10(np.array([backoff[k].get(g, 1.0) for g in grams]))
+        sort = np.argsort(keys)
+        arrays[f'keys{k}'] = keys[sort]
+        arrays[f'logp{k}'], arrays[f'logp_codebook{k}'] = _quantize(logp[sort])
+        arrays[f'bow{k}'], arrays[f'bow_codebook{k}'] = _quantize(bow[sort])
+    return arrays
+
+def _encode(gram, char_ids, base):
+    key = 0
+    for c in gram:
+        key = key * base + char_ids.get(c, 0)
+    return key
+
+def save_char_lm(path, arrays):
+    np.savez_compressed(path, **arrays)
+
+class CharLanguageModel:
+    """Batched scorer over char_lm.npz."""
+
+    def __init__(self, arrays):
+        self.order = int(arrays['order'])
+        self.base = int(arrays['base'])
+        self.unk_log10 = float(arrays['unk_log10'])
+        alphabet = arrays['alphabet'].tolist()
+        self.char_ids = {c: i + 1 for i, c in enumerate(alphabet)}
+        self.keys = [None]
+        self.logp = [None]
+        self.bow = [None]
+        for k in range(1, self.order + 1):
+            self.keys.append(arrays[f'keys{k}'])
+            self.logp.append(arrays[f'logp_codebook{k}'][arrays[f'logp{k}']].astype(np.float64))
+            self.bow.append(arrays[f'bow_codebook{k}'][arrays[f'bow{k}']].astype(np.float64))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as npz:
+            return cls({k: npz[k] for k in npz.files})
+
+    def _lookup(self, k, keys):
+        """(found mask, row index) of keys in the order-k table."""
+        table = self.keys[k]
+        if len(table) == 0:
+            return np.zeros(len(keys), dtype=bool), np.zeros(len(keys), dtype=np.int64)
+        rows = np.minimum(np.searchsorted(table, keys), len(table) - 1)
+        return table[rows] == keys, rows
+
+    def char_logprobs(self, words):
+        """
+        log10 P of every predicted character of every word, plus the word
+        boundaries: returns (logprobs, offsets) with word i's characters
+        at logprobs[offsets[i]:offsets[i + 1]].
+        """
+        order, base = self.order, self.base
+        ids, targets, lengths = [], [], []
+        for word in words:
+            s = [self.char_ids[BOW]] + [self.char_ids.get(c, 0) for c in word] + [self.char_ids[EOW]]
+            start = len(ids)
+            ids.extend(s)
+            targets.extend(range(start + 1, start + len(s)))
+            lengths.append(len(s) - 1)
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        if not targets:
+            return np.zeros(0), offsets
+
+        ids = np.array(ids, dtype=np.int64)
+        targets = np.array(targets, dtype=np.int64)
+        # Distance from each target back to its word's "^" bounds the usable history
+        word_start = np.repeat(offsets[:-1] + np.arange(len(lengths)), lengths)
+        history = targets - word_start
+
+        logprob = np.full(len(targets), np.nan)
+        backoff_sum = np.zeros(len(targets))
+        gram_keys = np.zeros(len(targets), dtype=np.int64)
+        context_keys = np.zeros(len(targets), dtype=np.int64)
+        for k in range(1, order + 1):
+            usable = history >= k - 1
+            # Order-k gram ends at the target; its context is the previous k-1 chars.
+            # Clamped so positions before the batch start never index (or wrap);
+            # those lanes are masked off by usable anyway.
+            first = ids[np.maximum(targets - k + 1, 0)]
+            gram_keys = np.where(usable, first * base ** (k - 1) + gram_keys, 0)
+            found, rows = self._lookup(k, gram_keys)
+            found &= usable
+            logprob = np.where(found, self.logp[k][rows], logprob)
+            # Any longer match resets the backoff chain accumulated below it
+            backoff_sum = np.where(found, 0.0, backoff_sum)
+            if k > 1:
+                context_keys = np.where(usable, first * base ** (k - 2) + context_keys, 0)
+                ctx_found, ctx_rows = self._lookup(k - 1, context_keys)
+                ctx_found &= usable & ~found
+                backoff_sum = backoff_sum + np.where(ctx_found, self.bow[k - 1][ctx_rows], 0.0)
+
+        logprob = np.where(np.isnan(logprob), self.unk_log10, logprob)
+        return logprob + backoff_sum, offsets
+
+    def logprob(self, word):
+        """Total log10 P of one word (including its end marker)."""
+        scores, _ = self.char_logprobs([_normalize(word)])
+        return float(scores.sum())
+
+    def score(self, words):
+        """
+        Mean log10 P per character for each word, as a NumPy array; higher
+        is more plausible. Words are normalized like corpus tokens.
+        """
+        words = [_normalize(w) for w in words]
+        scores, offsets = self.char_logprobs(words)
+        totals = np.add.reduceat(scores, offsets[:-1]) if len(scores) else np.zeros(len(words))
+        return totals / np.diff(offsets)
+
+def _normalize(word):
+    return normalize_token(word, min_len=1) or ''
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__.strip().split('Usage:')[1].rstrip())
+        sys.exit(1)
+
+    lm = CharLanguageModel.load(sys.argv[1])
+    words = sys.argv[2:]
+    for word, score in zip(words, lm.score(words)):
+        print(f"  {word:20} {score:7.3f}")
+
+if __name__ == '__main__':
+    main()
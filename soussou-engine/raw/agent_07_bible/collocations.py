@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Collocation statistics (PMI, log-likelihood) over corpus bigram counts.
+
+Words are integer-coded and every statistic is computed on NumPy arrays in
+one shot over all observed pairs - no per-pair Python loop - so the whole
+Bible vocabulary scores in well under a second.
+
+For a pair (w1, w2) seen c12 times, with c1 = count(w1 as left word),
+c2 = count(w2 as right word) and N = total bigrams:
+
+    PMI  = log2(c12 * N / (c1 * c2))
+    LLR  = Dunning's G^2 over the 2x2 contingency table
+           [[c12, c1 - c12], [c2 - c12, N - c1 - c2 + c12]]
+
+Pairs are ranked by LLR (robust for rare words); PMI is reported alongside.
+"""
+
+import numpy as np
+
+def encode_bigrams(bigram_counts):
+    """
+    {"w1 w2": count} -> (vocab, left_ids, right_ids, counts) as NumPy arrays.
+    """
+    vocab_index = {}
+    left = np.empty(len(bigram_counts), dtype=np.int32)
+    right = np.empty(len(bigram_counts), dtype=np.int32)
+    counts = np.empty(len(bigram_counts), dtype=np.int64)
+
+    for i, (pair, count) in enumerate(bigram_counts.items()):
+        w1, w2 = pair.split(' ')
+        left[i] = vocab_index.setdefault(w1, len(vocab_index))
+        right[i] = vocab_index.setdefault(w2, len(vocab_index))
+        counts[i] = count
+
+    vocab = [None] * len(vocab_index)
+    for word, idx in vocab_index.items():
+        vocab[idx] = word
+    return vocab, left, right, counts
+
+def _xlogx_over(k, expected):
+    """k * ln(k / expected), with 0 where k == 0."""
+    out = np.zeros_like(k, dtype=np.float64)
+    mask = k > 0
+    out[mask] = k[mask] * np.log(k[mask] / expected[mask])
+    return out
+
+def score_pairs(vocab_size, left, right, counts):
+    """Vectorized PMI and LLR for every observed pair."""
+    c12 = counts.astype(np.float64)
+    n = c12.sum()
+    c1 = np.bincount(left, weights=c12, minlength=vocab_size)[left]
+    c2 = np.bincount(right, weights=c12, minlength=vocab_size)[right]
+
+    pmi = np.log2(c12 * n / (c1 * c2))
+
+    k11 = c12
+    k12 = c1 - c12
+    k21 = c2 - c12
+    k22 = n - c1 - c2 + c12
+    row1, row2 = k11 + k12, k21 + k22
+    col1, col2 = k11 + k21, k12 + k22
+    llr = 2.0 * (_xlogx_over(k11, row1 * col1 / n)
+                 + _xlogx_over(k12, row1 * col2 / n)
+                 + _xlogx_over(k21, row2 * col1 / n)
+                 + _xlogx_over(k22, row2 * col2 / n))
+    # Negative association (pair rarer than chance) is not a collocation
+    llr[pmi < 0] = 0.0
+
+    return pmi, llr
+
+def rank_collocations(bigram_counts, min_count=3, top_k=10):
+    """
+    Ranked collocates per word: {word: [{pair, count, pmi, llr}, ...]}.
+
+    Each word lists its strongest pairs whether it is the left or the right
+    member, best LLR first.
+    """
+    vocab, left, right, counts = encode_bigrams(bigram_counts)
+    if not len(counts):
+        return {}
+    pmi, llr = score_pairs(len(vocab), left, right, counts)
+
+    keep = np.flatnonzero((counts >= min_count) & (llr > 0))
+    # Visit every kept pair once per member, best LLR first, so each word's
+    # list fills in rank order and stops at top_k
+    order = keep[np.argsort(-llr[keep], kind='stable')]
+
+    ranked = {}
+    for i in order.tolist():
+        w1, w2 = vocab[left[i]], vocab[right[i]]
+        item = {
+            'pair': f'{w1} {w2}',
+            'count': int(counts[i]),
+            'pmi': round(float(pmi[i]), 3),
+            'llr': round(float(llr[i]), 2),
+        }
+        for word in (w1, w2) if w1 != w2 else (w1,):
+            bucket = ranked.setdefault(word, [])
+            if len(bucket) < top_k:
+                bucket.append(item)
+    return ranked
+
+def collocations_for_lexicon(lexicon, ranked, top_k=10):
+    """
+    Map lexicon entries to corpus collocates via their base/variant spellings.
+
+    Returns {entry_id: [...]} for entries with at least one collocate.
+    """
+    by_entry = {}
+    for entry in lexicon:
+        forms = {entry.get('base', '').lower()}
+        forms.update(v.lower() for v in entry.get('variants', []))
+        merged = {}
+        for form in forms:
+            for item in ranked.get(form, []):
+                merged[item['pair']] = item
+        if merged:
+            items = sorted(merged.values(), key=lambda x: -x['llr'])[:top_k]
+            by_entry[entry['id']] = {'base': entry.get('base', ''), 'collocations': items}
+    return by_entry
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Positional inverted index (concordance) over the readaloud corpus.
+
+word -> postings of (book, chapter, verse, token offset), so usage examples
+for any lexicon word are an index lookup instead of a grep over every file.
+
+Every word is indexed, one-letter pronouns (a, n, i, e) included, so phrase
+queries keep them and offsets count them. The term/posting totals reported
+by build_concordance leave them out to line up with validated.json.
+
+File layout (concordance.bin):
+    b'SUSCONC2'                  magic
+    u32 little-endian            header length
+    header (UTF-8 JSON)          {"corpus", "chapters": [[book, chapter, file]],
+                                  "terms": {word: [blob_start, blob_len, count]}}
+    blob                         varint postings, concatenated per term
+
+Postings of a term are sorted by (chapter, verse, offset) and delta-encoded
+as unsigned varints, three per occurrence:
+    chapter delta; verse (absolute if the chapter changed, else delta);
+    offset (absolute if chapter or verse changed, else delta)
+
+Usage:
+    python concordance.py concordance.bin naxa          # KWIC lines
+    python concordance.py concordance.bin "ala naxa"    # phrase lookup
+"""
+
+import json
+import struct
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from corpus import normalize_token, open_corpus, tokenize_line
+
+MAGIC = b'SUSCONC2'
+
+# Index one-letter words too (corpus.tokenize_line drops them by default)
+MIN_LEN = 1
+
+# Shortest word counted in validated.json, for the reported totals
+VOCABULARY_MIN_LEN = 2
+
+Posting = namedtuple('Posting', 'book chapter verse offset')
+KwicLine = namedtuple('KwicLine', 'ref left keyword right')
+
+def _put_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+def _iter_varints(data):
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+class _TermWriter:
+    """Delta-encodes one term's postings as they arrive in corpus order."""
+    __slots__ = ('buf', 'count', 'doc', 'verse', 'offset')
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.count = 0
+        self.doc = 0
+        self.verse = -1
+        self.offset = 0
+
+    def add(self, doc, verse, offset):
+        buf = self.buf
+        if self.count == 0 or doc != self.doc:
+            _put_varint(buf, doc - self.doc)
+            _put_varint(buf, verse)
+            _put_varint(buf, offset)
+        elif verse != self.verse:
+            _put_varint(buf, 0)
+            _put_varint(buf, verse - self.verse)
+            _put_varint(buf, offset)
+        else:
+            _put_varint(buf, 0)
+            _put_varint(buf, 0)
+            _put_varint(buf, offset - self.offset)
+        self.doc, self.verse, self.offset = doc, verse, offset
+        self.count += 1
+
+def build_concordance(corpus_path, output_path):
+    """
+    Index every chapter of a readaloud directory or corpus.pack.
+
+    Returns (terms, postings), counting only words validated.json keeps.
+    """
+    chapters = []
+    terms = {}
+
+    with open_corpus(corpus_path) as corpus:
+        for doc, (name, book, chapter, verses) in enumerate(corpus.iter_chapters()):
+            chapters.append([book, chapter, name])
+            for verse, text in verses:
+                for offset, word in enumerate(tokenize_line(text, MIN_LEN)):
+                    writer = terms.get(word)
+                    if writer is None:
+                        writer = terms[word] = _TermWriter()
+                    writer.add(doc, verse, offset)
+
+    blob = bytearray()
+    term_table = {}
+    for word in sorted(terms):
+        writer = terms[word]
+        term_table[word] = [len(blob), len(writer.buf), writer.count]
+        blob += writer.buf
+
+    header = json.dumps({
+        'corpus': str(Path(corpus_path).resolve()),
+        'chapters': chapters,
+        'terms': term_table,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    with open(output_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(blob)
+
+    counted = [t for word, t in term_table.items() if len(word) >= VOCABULARY_MIN_LEN]
+    return len(counted), sum(t[2] for t in counted)
+
+class Concordance:
+    """Read-side API over concordance.bin."""
+
+    def __init__(self, path, corpus=None):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a concordance index")
+            (header_len,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_len).decode('utf-8'))
+            self._blob = f.read()
+
+        self.chapters = header['chapters']
+        self.terms = header['terms']
+        # Verse text for KWIC comes from the directory or pack that was indexed
+        self.corpus = open_corpus(corpus or header['corpus'])
+
+    def __contains__(self, word):
+        return (normalize_token(word, MIN_LEN) or '') in self.terms
+
+    def count(self, word):
+        """Corpus frequency of a word."""
+        term = self.terms.get(normalize_token(word, MIN_LEN) or '')
+        return term[2] if term else 0
+
+    def _raw_postings(self, word):
+        """Decoded (doc, verse, offset) triples for a normalized word."""
+        term = self.terms.get(word)
+        if not term:
+            return []
+        start, length, _ = term
+        values = _iter_varints(self._blob[start:start + length])
+        out = []
+        doc = verse = offset = 0
+        for d_doc, d_verse, d_offset in zip(values, values, values):
+            if d_doc:
+                doc += d_doc
+                verse, offset = d_verse, d_offset
+            elif d_verse or not out:
+                verse += d_verse
+                offset = d_offset
+            else:
+                offset += d_offset
+            out.append((doc, verse, offset))
+        return out
+
+    def postings(self, word):
+        """Every occurrence of word as Posting(book, chapter, verse, offset)."""
+        chapters = self.chapters
+        return [Posting(chapters[d][0], chapters[d][1], v, o)
+                for d, v, o in self._raw_postings(normalize_token(word, MIN_LEN) or '')]
+
+    def find(self, phrase):
+        """(doc, verse, offset) of each occurrence of a one-or-more word phrase."""
+        words = tokenize_line(phrase, MIN_LEN)
+        if not words:
+            return []
+        # Intersect on the rarest word, then check the others by position
+        rarest = min(range(len(words)), key=lambda i: self.terms.get(words[i], [0, 0, 0])[2])
+        candidates = {(d, v, o - rarest) for d, v, o in self._raw_postings(words[rarest])}
+        for i, word in enumerate(words):
+            if i == rarest or not candidates:
+                continue
+            candidates &= {(d, v, o - i) for d, v, o in self._raw_postings(word)}
+        return sorted(candidates)
+
+    @lru_cache(maxsize=64)
+    def _verse_tokens(self, doc):
+        verses = self.corpus.chapter_verses(self.chapters[doc][2])
+        return {verse: tokenize_line(text, MIN_LEN) for verse, text in verses}
+
+    def kwic(self, phrase, width=6, limit=20):
+        """Keyword-in-context lines for a word or phrase (reads only matching chapters)."""
+        span = max(len(tokenize_line(phrase, MIN_LEN)), 1)
+        lines = []
+        for doc, verse, offset in self.find(phrase)[:limit]:
+            tokens = self._verse_tokens(doc).get(verse, [])
+            book, chapter, _ = self.chapters[doc]
+            lines.append(KwicLine(
+                f"{book} {chapter}:{verse}",
+                ' '.join(tokens[max(0, offset - width):offset]),
+                ' '.join(tokens[offset:offset + span]),
+                ' '.join(tokens[offset + span:offset + span + width]),
+            ))
+        return lines
+
+    def close(self):
+        self.corpus.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__.strip().split('Usage:')[1].rstrip())
+        sys.exit(1)
+
+    with Concordance(sys.argv[1]) as index:
+        for phrase in sys.argv[2:]:
+            hits = index.find(phrase)
+            print(f"\n=== {phrase} ({len(hits):,} occurrences) ===")
+            for line in index.kwic(phrase):
+                print(f"  {line.ref:12} {line.left:>45} [{line.keyword}] {line.right}")
+
+if __name__ == '__main__':
+    main()
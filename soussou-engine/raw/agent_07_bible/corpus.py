@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Shared readaloud corpus primitives: tokenizer and chapter/verse layout.
+
+Every corpus stage (extract_vocabulary, concordance, n-grams, ...) tokenizes
+through this module so their counts and positions agree.
+
+Readaloud chapter files look like:
+
+    <BOM>Fe Fɔlɔ Fɔlɛ.          <- book title (verse 0)
+    1.                          <- chapter marker
+    A fɔlɛ ra, Ala naxa ...     <- verse 1 (one verse per line)
+    Duniɲa mu nu yailanxi, ...  <- verse 2
+"""
+
+import re
+from pathlib import Path
+
+# Extract words - keep Soussou special characters (ɔ, ɛ, ɲ, ŋ, etc.)
+# Word pattern: letters including accented/special chars
+WORD_PATTERN = r"[a-zA-ZɔɛɲŋƐƆÑàáâãäèéêëìíîïòóôõöùúûüÀÁÂÃÄÈÉÊËÌÍÎÏÒÓÔÕÖÙÚÛÜ'']+"
+
+# Bump when tokenization rules change so cached per-chapter counts are rebuilt
+TOKENIZER_VERSION = 1
+
+# Compiled once. Digits are not in the class, so line numbers ("12\t") and
+# chapter/verse markers ("1.") are skipped by the same scan that finds words.
+WORD_RE = re.compile(WORD_PATTERN)
+
+CHAPTER_MARKER_RE = re.compile(r'^\s*\d+\.\s*$')
+
+def normalize_token(word, min_len=2):
+    """Clean and normalize a raw match; None if shorter than min_len (single characters)."""
+    word = word.strip("'").lower()
+    return word if len(word) >= min_len else None
+
+def tokenize_line(line, min_len=2):
+    """
+    Normalized words of one line, in order.
+
+    min_len=1 keeps one-letter pronouns (a, n, i, e), which matter for
+    multi-word patterns but are dropped from the vocabulary counts.
+    """
+    tokens = []
+    for match in WORD_RE.findall(line):
+        word = normalize_token(match, min_len)
+        if word:
+            tokens.append(word)
+    return tokens
+
+def iter_tokens(filepath):
+    """Stream normalized words from a text file, one line at a time."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            for match in WORD_RE.findall(line):
+                word = normalize_token(match)
+                if word:
+                    yield word
+
+def list_chapter_files(corpus_dir):
+    """All *_read.txt chapter files, in canonical (file name) order."""
+    return [f for f in sorted(Path(corpus_dir).glob('*.txt')) if '_read.txt' in f.name]
+
+def chapter_ref(filepath):
+    """(book, chapter) from a name like sus_002_GEN_01_read.txt -> ('GEN', 1)."""
+    parts = Path(filepath).name.split('_')
+    if len(parts) >= 4 and parts[3].isdigit():
+        return parts[2], int(parts[3])
+    return (parts[2] if len(parts) >= 3 else Path(filepath).stem), 0
+
+def iter_verses(filepath):
+    """
+    Yield (verse, text) for one chapter file.
+
+    Lines before the chapter marker (the book title) are joined into verse 0;
+    each non-blank line after it is the next verse. Files without a marker
+    (e.g. the eBible intro) are entirely verse 0.
+    """
+    heading = []
+    verse = 0
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            text = line.strip()
+            if not text:
+                continue
+            if verse == 0 and CHAPTER_MARKER_RE.match(text):
+                if heading:
+                    yield 0, ' '.join(heading)
+                    heading = []
+                verse = 1
+                continue
+            if verse == 0:
+                heading.append(text)
+            else:
+                yield verse, text
+                verse += 1
+    if heading:
+        yield 0, ' '.join(heading)
+
+class DirectoryCorpus:
+    """The readaloud directory itself: one file per chapter."""
+
+    def __init__(self, corpus_dir):
+        self.path = Path(corpus_dir)
+
+    def iter_chapters(self):
+        """Yield (file name, book, chapter, verses) with verses = [(verse, text)]."""
+        for txt_file in list_chapter_files(self.path):
+            book, chapter = chapter_ref(txt_file)
+            yield txt_file.name, book, chapter, list(iter_verses(txt_file))
+
+    def chapter_verses(self, name):
+        """[(verse, text)] for one chapter file name."""
+        return list(iter_verses(self.path / name))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_corpus(path):
+    """
+    A packed corpus file (see corpus_pack.py) or a readaloud directory.
+
+    Both are context managers; a packed corpus holds an mmap until closed.
+    """
+    if Path(path).is_file():
+        from corpus_pack import PackedCorpus
+        return PackedCorpus(path)
+    return DirectoryCorpus(path)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Packed readaloud corpus: every chapter in one memory-mapped UTF-8 blob.
+
+Corpus-wide stages (concordance, n-grams, verse store, ...) read verses
+from the pack instead of opening and decoding 1,190 small files; all of
+them share one page-cached buffer and slice it without copying.
+
+File layout (corpus.pack):
+    b'SUSPACK1'                 magic
+    u32 little-endian           header length
+    header (UTF-8 JSON)         {"byteorder", "verse_count", "chapters":
+                                 [[file, book, chapter, first_verse, n_verses]]}
+                                (tables below use the packing machine's byte order)
+    padding to 8 bytes
+    u64[verse_count + 1]        byte offset of each verse in the blob
+    u32[verse_count]            verse number of each verse row
+    blob                        verse texts, each followed by '\n'
+
+Verse rows are in corpus order, so chapter c owns rows
+first_verse .. first_verse + n_verses - 1.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from corpus import DirectoryCorpus
+
+MAGIC = b'SUSPACK1'
+
+def build_pack(corpus_dir, output_path):
+    """Pack every chapter under corpus_dir; returns (chapters, verses, blob bytes)."""
+    chapters = []
+    verse_numbers = array('I')
+    verse_starts = array('Q')
+    blob = bytearray()
+
+    for name, book, chapter, verses in DirectoryCorpus(corpus_dir).iter_chapters():
+        chapters.append([name, book, chapter, len(verse_numbers), len(verses)])
+        for verse, text in verses:
+            verse_numbers.append(verse)
+            verse_starts.append(len(blob))
+            blob += text.encode('utf-8')
+            blob += b'\n'
+    verse_starts.append(len(blob))
+
+    header = json.dumps({
+        'byteorder': sys.byteorder,
+        'verse_count': len(verse_numbers),
+        'chapters': chapters,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    with open(output_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        f.write(b'\0' * (-f.tell() % 8))
+        verse_starts.tofile(f)
+        verse_numbers.tofile(f)
+        f.write(blob)
+
+    return len(chapters), len(verse_numbers), len(blob)
+
+class PackedCorpus:
+    """mmap'd reader; same iter_chapters()/chapter_verses() API as DirectoryCorpus."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a packed corpus")
+
+        (header_len,) = struct.unpack_from('<I', self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mm[start:start + header_len].decode('utf-8'))
+        if header['byteorder'] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was packed on a {header['byteorder']}-endian machine")
+
+        self.chapters = header['chapters']
+        self._by_name = {c[0]: i for i, c in enumerate(self.chapters)}
+        n = header['verse_count']
+
+        pos = start + header_len
+        pos += -pos % 8
+        view = memoryview(self._mm)
+        self.verse_starts = view[pos:pos + 8 * (n + 1)].cast('Q')
+        pos += 8 * (n + 1)
+        self.verse_numbers = view[pos:pos + 4 * n].cast('I')
+        pos += 4 * n
+        self.blob = view[pos:]
+
+    def __len__(self):
+        return len(self.verse_numbers)
+
+    def verse_bytes(self, row):
+        """Zero-copy UTF-8 slice of one verse row (without the newline)."""
+        return self.blob[self.verse_starts[row]:self.verse_starts[row + 1] - 1]
+
+    def verse_text(self, row):
+        return str(self.verse_bytes(row), 'utf-8')
+
+    def chapter_rows(self, index):
+        _, _, _, first, count = self.chapters[index]
+        return range(first, first + count)
+
+    def chapter_bytes(self, index):
+        """Zero-copy UTF-8 slice of a whole chapter, one verse per line."""
+        rows = self.chapter_rows(index)
+        if not rows:
+            return self.blob[0:0]
+        return self.blob[self.verse_starts[rows.start]:self.verse_starts[rows.stop]]
+
+    def iter_chapters(self):
+        """Yield (file name, book, chapter, verses) with verses = [(verse, text)]."""
+        for i, (name, book, chapter, _, _) in enumerate(self.chapters):
+            yield name, book, chapter, [(self.verse_numbers[r], self.verse_text(r))
+                                        for r in self.chapter_rows(i)]
+
+    def chapter_verses(self, name):
+        """[(verse, text)] for one chapter file name."""
+        return [(self.verse_numbers[r], self.verse_text(r))
+                for r in self.chapter_rows(self._by_name[name])]
+
+    def close(self):
+        # Release exported memoryviews before the mmap itself
+        for attr in ('verse_starts', 'verse_numbers', 'blob'):
+            view = self.__dict__.pop(attr, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Per-chapter token count cache for extract_vocabulary.py.
+
+Each chapter's Counter is stored on disk keyed by its path. An entry is
+reused when the file's (mtime, size) are unchanged; if only the mtime moved
+(checkout, touch, copy) the content hash decides. A change of tokenizer
+(different signature) discards the whole cache.
+"""
+
+import hashlib
+import os
+import pickle
+from collections import Counter
+
+CACHE_VERSION = 1
+
+def file_digest(filepath):
+    """SHA-1 of the file contents."""
+    with open(filepath, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+class CountCache:
+    """On-disk map: chapter path -> (mtime_ns, size, sha1, Counter)."""
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self.entries = {}
+        self.seen = set()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            # Truncated or foreign file: start over rather than fail the run
+            print(f"Ignoring unreadable count cache {self.path}: {e}")
+            self.dirty = True
+            return
+
+        if data.get('version') == CACHE_VERSION and data.get('signature') == self.signature:
+            self.entries = data['entries']
+        else:
+            self.dirty = True
+
+    def lookup(self, filepath):
+        """Cached Counter for filepath, or None if it must be re-tokenized."""
+        key = os.path.abspath(filepath)
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        st = os.stat(filepath)
+        if entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            self.hits += 1
+            return entry['counts']
+
+        if entry['size'] == st.st_size and entry['sha1'] == file_digest(filepath):
+            entry['mtime_ns'] = st.st_mtime_ns
+            self.dirty = True
+            self.hits += 1
+            return entry['counts']
+
+        self.misses += 1
+        return None
+
+    def store(self, filepath, counts):
+        key = os.path.abspath(filepath)
+        st = os.stat(filepath)
+        self.seen.add(key)
+        self.entries[key] = {
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha1': file_digest(filepath),
+            'counts': Counter(counts),
+        }
+        self.dirty = True
+
+    def save(self):
+        """Drop entries for chapters that no longer exist and write atomically."""
+        stale = set(self.entries) - self.seen
+        for key in stale:
+            del self.entries[key]
+        if not (self.dirty or stale):
+            return
+
+        data = {'version': CACHE_VERSION, 'signature': self.signature, 'entries': self.entries}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.dirty = False
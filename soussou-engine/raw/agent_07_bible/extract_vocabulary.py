@@ -4,43 +4,27 @@ Extract unique Soussou vocabulary from Bible text files.
 """
 
 import os
-import re
 import json
+import argparse
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from corpus import WORD_PATTERN, TOKENIZER_VERSION, iter_tokens, list_chapter_files
+from count_cache import CountCache
+
 def extract_words_from_file(filepath):
     """Extract words from a single text file."""
-    words = []
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            text = f.read()
-
-        # Remove line numbers (format: spaces + number + tab)
-        text = re.sub(r'^\s*\d+\t', '', text, flags=re.MULTILINE)
-
-        # Remove verse numbers
-        text = re.sub(r'\b\d+\b', '', text)
+    return list(iter_tokens(filepath))
 
-        # Extract words - keep Soussou special characters (ɔ, ɛ, ɲ, ŋ, etc.)
-        # Word pattern: letters including accented/special chars
-        word_pattern = r"[a-zA-ZɔɛɲŋƐƆÑàáâãäèéêëìíîïòóôõöùúûüÀÁÂÃÄÈÉÊËÌÍÎÏÒÓÔÕÖÙÚÛÜ'']+"
+def categorize_word(word, segmenter=None):
+    """
+    Attempt to categorize word based on Soussou linguistic patterns.
 
-        found_words = re.findall(word_pattern, text, re.UNICODE)
-
-        for word in found_words:
-            # Clean and normalize
-            word = word.strip("'").strip("'").lower()
-            if len(word) >= 2:  # Skip single characters
-                words.append(word)
-
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}")
-
-    return words
-
-def categorize_word(word):
-    """Attempt to categorize word based on Soussou linguistic patterns."""
+    With a MorphologySegmenter (morphology.py), affix-based categories come
+    from data/morphology_patterns.json; words it cannot place still get the
+    naxa-/-xi guesses.
+    """
     word_lower = word.lower()
 
     # Pronouns
@@ -48,13 +32,6 @@ def categorize_word(word):
     if word_lower in pronouns:
         return 'pronoun'
 
-    # Common verbs (by pattern)
-    if word_lower.startswith('naxa') or word_lower.endswith('xi'):
-        return 'verb'
-
-    # Nouns (by pattern - many end in 'e' or 'i')
-    # This is a rough heuristic
-
     # Negation
     if word_lower in ['mu', 'ma']:
         return 'particle'
@@ -63,35 +40,162 @@ def categorize_word(word):
     if word_lower in ['nun', 'kɔnɔ', 'xa', 'alako', 'barima']:
         return 'conjunction'
 
+    if segmenter is not None:
+        category = segmenter.segment(word_lower).category
+        if category is not None:
+            return category
+
+    # Common verbs (by pattern)
+    if word_lower.startswith('naxa') or word_lower.endswith('xi'):
+        return 'verb'
+
+    # Nouns (by pattern - many end in 'e' or 'i')
+    # This is a rough heuristic
+
     # Default
     return 'unknown'
 
+def count_words_in_file(filepath):
+    """
+    Tokenize one chapter file into a word Counter (runs in pool workers).
+
+    Returns None if the file could not be read or decoded, so a partial
+    count is never mistaken for the chapter's real one.
+    """
+    counts = Counter()
+    try:
+        counts.update(iter_tokens(filepath))
+    except Exception as e:
+        print(f"Error reading {filepath}: {e}")
+        return None
+    return counts
+
+def _tokenize_files(files, jobs):
+    """Counters for files, in order; in a process pool if jobs > 1."""
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(count_words_in_file, files, chunksize=16)
+    else:
+        for txt_file in files:
+            yield count_words_in_file(txt_file)
+
+def count_corpus(files, jobs=1, cache=None):
+    """
+    Yield (file, Counter) per chapter, in order; the Counter is None for a
+    chapter that failed to read.
+
+    With a cache, only new or changed chapters are tokenized; the rest are
+    served from the cache. Fresh counts are stored back into it; failed
+    chapters never are, so the next run retries them.
+    """
+    cached = {f: cache.lookup(f) if cache else None for f in files}
+    stale = [f for f in files if cached[f] is None]
+    fresh = _tokenize_files(stale, jobs)
+
+    for txt_file in files:
+        counts = cached[txt_file]
+        if counts is None:
+            counts = next(fresh)
+            if cache and counts is not None:
+                cache.store(txt_file, counts)
+        yield txt_file, counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='tokenizer processes (0 = one per CPU, default 1)')
+    parser.add_argument('--input-dir', type=Path,
+                        default=Path('/home/user/ZION/soussou-engine/raw/agent_07_bible/readaloud'),
+                        help='directory of *_read.txt chapter files')
+    parser.add_argument('--output-dir', type=Path,
+                        default=Path('/home/user/ZION/soussou-engine/raw/agent_07_bible'),
+                        help='where validated.json is written')
+    parser.add_argument('--cache', type=Path, default=None,
+                        help='per-chapter count cache (default: OUTPUT_DIR/.count_cache.pkl)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-tokenize every chapter and leave the cache untouched')
+    parser.add_argument('--morphology', type=Path,
+                        default=Path('/home/user/ZION/soussou-engine/data/morphology_patterns.json'),
+                        help='affix patterns for word categories (falls back to built-in '
+                             'heuristics if missing)')
+    parser.add_argument('--pack', action='store_true',
+                        help='pack all chapters into OUTPUT_DIR/corpus.pack (mmap) and run the '
+                             'verse-level stages from it')
+    parser.add_argument('--term-matrix', action='store_true',
+                        help='also save per-chapter/per-book sparse counts to OUTPUT_DIR/term_matrix.npz')
+    parser.add_argument('--suffix-array', action='store_true',
+                        help='also build the vocabulary suffix array OUTPUT_DIR/suffix_array.npz')
+    parser.add_argument('--char-lm', action='store_true',
+                        help='train a character n-gram model on word forms -> OUTPUT_DIR/char_lm.npz')
+    parser.add_argument('--char-lm-order', type=int, default=5,
+                        help='character n-gram order for --char-lm (default: 5)')
+    parser.add_argument('--spelling-index', action='store_true',
+                        help='symmetric-delete suggestion index over corpus words and lexicon '
+                             'variants -> OUTPUT_DIR/symspell.npz')
+    parser.add_argument('--spelling-max-distance', type=int, default=2,
+                        help='largest edit distance --spelling-index supports (default: 2)')
+    parser.add_argument('--verse-store', action='store_true',
+                        help='parse chapters into verse records -> OUTPUT_DIR/verses.db (SQLite)')
+    parser.add_argument('--concordance', action='store_true',
+                        help='also build the positional index OUTPUT_DIR/concordance.bin')
+    parser.add_argument('--ngrams', action='store_true',
+                        help='also count bigrams/trigrams into OUTPUT_DIR/ngrams.json')
+    parser.add_argument('--ngram-min-count', type=int, default=2,
+                        help='drop n-grams seen fewer times from ngrams.json (default 2)')
+    parser.add_argument('--ngram-max-entries', type=int, default=500_000,
+                        help='cap on distinct n-grams held in memory per order (default 500000)')
+    parser.add_argument('--collocations', action='store_true',
+                        help='also rank PMI/log-likelihood collocations into OUTPUT_DIR/collocations.json')
+    parser.add_argument('--lexicon', type=Path,
+                        default=Path('/home/user/ZION/soussou-engine/data/lexicon.json'),
+                        help='lexicon.json used to key collocations by entry id (skipped if missing)')
+    return parser.parse_args()
+
 def main():
-    base_dir = Path('/home/user/ZION/soussou-engine/raw/agent_07_bible/readaloud')
-    output_dir = Path('/home/user/ZION/soussou-engine/raw/agent_07_bible')
+    args = parse_args()
+    base_dir = args.input_dir
+    output_dir = args.output_dir
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
-    all_words = []
+    cache = None
+    if not args.no_cache:
+        cache_path = args.cache or output_dir / '.count_cache.pkl'
+        cache = CountCache(cache_path, signature=(TOKENIZER_VERSION, WORD_PATTERN))
+
+    word_counts = Counter()
     file_count = 0
     book_stats = {}
+    chapter_counts = []  # kept only when a per-chapter artifact needs them
+    failed = []
+
+    # Process all text files; per-file counters are reduced into word_counts
+    files = list_chapter_files(base_dir)
+    for txt_file, counts in count_corpus(files, jobs, cache):
+        if counts is None:
+            failed.append(txt_file)
+            counts = Counter()
+        word_counts.update(counts)
+        file_count += 1
+        if args.term_matrix:
+            chapter_counts.append((txt_file, counts))
+
+        # Extract book code (e.g., GEN, EXO, MAT)
+        parts = txt_file.name.split('_')
+        if len(parts) >= 3:
+            book = parts[2]
+            if book not in book_stats:
+                book_stats[book] = {'files': 0, 'words': 0}
+            book_stats[book]['files'] += 1
+            book_stats[book]['words'] += sum(counts.values())
 
-    # Process all text files
-    for txt_file in sorted(base_dir.glob('*.txt')):
-        if '_read.txt' in txt_file.name:
-            words = extract_words_from_file(txt_file)
-            all_words.extend(words)
-            file_count += 1
-
-            # Extract book code (e.g., GEN, EXO, MAT)
-            parts = txt_file.name.split('_')
-            if len(parts) >= 3:
-                book = parts[2]
-                if book not in book_stats:
-                    book_stats[book] = {'files': 0, 'words': 0}
-                book_stats[book]['files'] += 1
-                book_stats[book]['words'] += len(words)
-
-    # Count word frequencies
-    word_counts = Counter(all_words)
+    if cache:
+        cache.save()
+
+    # Affix categories; the segmenter caches each word type as it is categorized
+    segmenter = None
+    if args.morphology.exists():
+        from morphology import MorphologySegmenter
+        segmenter = MorphologySegmenter.from_file(args.morphology, vocabulary=word_counts)
 
     # Build vocabulary with metadata
     vocabulary = {}
@@ -99,7 +203,7 @@ def main():
         vocabulary[word] = {
             'word': word,
             'frequency': count,
-            'category': categorize_word(word),
+            'category': categorize_word(word, segmenter),
             'source': 'Soso Kitaabuie Bible (eBible.org)'
         }
 
@@ -140,9 +244,97 @@ def main():
     with open(output_dir / 'validated.json', 'w', encoding='utf-8') as f:
         json.dump(validated_data, f, ensure_ascii=False, indent=2)
 
+    # Verse-level stages read the packed corpus when asked to build one
+    corpus_source = base_dir
+    if args.pack:
+        from corpus_pack import build_pack
+        corpus_source = output_dir / 'corpus.pack'
+        chapters, verses, size = build_pack(base_dir, corpus_source)
+        print(f"Corpus pack: {chapters:,} chapters, {verses:,} verses, {size / (1024 * 1024):.2f} MB")
+
+    if args.term_matrix:
+        from term_matrix import build_term_matrix, save_term_matrix
+        arrays = build_term_matrix(chapter_counts, list(sorted_vocab))
+        save_term_matrix(output_dir / 'term_matrix.npz', arrays)
+        print(f"Term matrix: {len(arrays['chapter_number']):,} chapters x "
+              f"{len(arrays['vocab']):,} terms, {len(arrays['chapter_data']):,} non-zeros")
+
+    if args.suffix_array:
+        from suffix_array import VocabularySuffixIndex
+        suffix_index = VocabularySuffixIndex.from_vocabulary(sorted_vocab)
+        suffix_index.save(output_dir / 'suffix_array.npz')
+        print(f"Suffix array: {len(suffix_index.sa.sa):,} suffixes over {len(sorted_vocab):,} words")
+
+    if args.char_lm:
+        from char_lm import train_char_lm, save_char_lm
+        arrays = train_char_lm(word_counts, order=args.char_lm_order)
+        save_char_lm(output_dir / 'char_lm.npz', arrays)
+        grams = sum(len(arrays[f'keys{k}']) for k in range(1, args.char_lm_order + 1))
+        print(f"Character LM: order {args.char_lm_order}, {len(arrays['alphabet']):,} symbols, "
+              f"{grams:,} n-grams")
+
+    if args.spelling_index:
+        from symspell import build_spelling_index
+        lexicon = None
+        if args.lexicon.exists():
+            with open(args.lexicon, 'r', encoding='utf-8') as f:
+                lexicon = json.load(f)
+        spelling = build_spelling_index(word_counts, lexicon, max_distance=args.spelling_max_distance)
+        spelling.save(output_dir / 'symspell.npz')
+        print(f"Spelling index: {len(spelling.terms):,} forms, {len(spelling.delete_hashes):,} deletes")
+
+    if args.verse_store:
+        from verse_store import build_verse_store
+        chapters, verses, tokens = build_verse_store(corpus_source, output_dir / 'verses.db')
+        print(f"Verse store: {chapters:,} chapters, {verses:,} verses, {tokens:,} tokens")
+
+    if args.concordance:
+        from concordance import build_concordance
+        terms, postings = build_concordance(corpus_source, output_dir / 'concordance.bin')
+        print(f"Concordance: {terms:,} terms, {postings:,} postings")
+
+    counters = None
+    if args.ngrams or args.collocations:
+        from ngrams import count_ngrams
+        counters = count_ngrams(corpus_source, max_entries=args.ngram_max_entries)
+
+    if args.ngrams:
+        from ngrams import build_ngram_report
+        ngram_report = build_ngram_report(counters, min_count=args.ngram_min_count)
+        with open(output_dir / 'ngrams.json', 'w', encoding='utf-8') as f:
+            json.dump(ngram_report, f, ensure_ascii=False, indent=2)
+        print(f"N-grams: {len(ngram_report['bigrams']):,} bigrams, "
+              f"{len(ngram_report['trigrams']):,} trigrams")
+
+    if args.collocations:
+        from collocations import rank_collocations, collocations_for_lexicon
+        ranked = rank_collocations(counters[2].counts)
+        collocation_data = {
+            'metadata': {
+                'source': 'Soso Kitaabuie Bible (eBible.org)',
+                'statistic': 'log-likelihood ratio (G^2), PMI in bits',
+                'words_with_collocates': len(ranked),
+            },
+            'by_word': ranked,
+        }
+        if args.lexicon.exists():
+            with open(args.lexicon, 'r', encoding='utf-8') as f:
+                lexicon = json.load(f)
+            collocation_data['by_entry'] = collocations_for_lexicon(lexicon, ranked)
+            collocation_data['metadata']['lexicon_entries_with_collocates'] = len(collocation_data['by_entry'])
+        with open(output_dir / 'collocations.json', 'w', encoding='utf-8') as f:
+            json.dump(collocation_data, f, ensure_ascii=False, indent=2)
+        print(f"Collocations: {len(ranked):,} words ranked")
+
     # Print summary
     print(f"\n=== SOUSSOU BIBLE VOCABULARY EXTRACTION ===")
     print(f"Files processed: {file_count}")
+    if cache:
+        print(f"Count cache: {cache.hits} reused, {cache.misses} tokenized")
+    if failed:
+        print(f"Failed to read {len(failed)} chapter(s), not cached:")
+        for txt_file in failed:
+            print(f"  {txt_file}")
     print(f"Bible books covered: {len(book_stats)}")
     print(f"Total word occurrences: {sum(word_counts.values()):,}")
     print(f"Unique words extracted: {len(sorted_vocab):,}")
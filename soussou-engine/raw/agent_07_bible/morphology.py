@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Trie-based morphological segmenter driven by data/morphology_patterns.json.
+
+All affixes in the patterns file are compiled once into a prefix trie and a
+suffix trie (suffixes stored reversed), and every word type is segmented by
+walking those tries - no per-word regex. Results are cached per word type,
+so segmenting the whole corpus vocabulary is one batch pass.
+
+Where affixes come from:
+    verb_suffixes.patterns       "-xi", "-fé" -> suffix, "ra-", "ma-" -> prefix,
+                                 bare forms ("bara", "ne/nɛ") -> particles
+    plural_rules.patterns        "-e" -> plural suffix (noun)
+    word_formation_templates     "VERB_ROOT + xi", "ra + VERB", "PRONOUN_BASE + tan"
+    pronoun_contractions         pronoun bases (also the only stems allowed
+                                 for PRONOUN_BASE templates)
+    negation_rules, possessive_rules
+                                 whole-word particles / possessives
+
+To keep common word endings from being read as affixes, a split is only
+accepted when the remaining stem is itself attested in the vocabulary.
+The productive verb suffixes (-xi, -fé) may also strip an unattested stem
+of at least min_free_stem characters (falaxi, comprendfé), but not short
+ones, so nouns like mixi and bɔxi stay whole.
+"""
+
+import json
+import re
+import unicodedata
+from collections import namedtuple
+
+Segmentation = namedtuple('Segmentation', 'word prefixes stem suffixes category')
+
+_END = None  # trie key holding the affix rules that end at this node
+
+def _fold(text):
+    """Lowercase, drop apostrophes and accents on Latin vowels (é -> e), keep ɛ/ɔ."""
+    text = text.lower().replace("'", '').replace('’', '')
+    return ''.join(c for c in unicodedata.normalize('NFD', text)
+                   if unicodedata.category(c) != 'Mn')
+
+def _category_for(description):
+    """Map a pattern's function/generates text to a POS category."""
+    text = description.lower()
+    if 'pronoun' in text and 'plural marker' not in text:
+        return 'pronoun'
+    if 'plural' in text:
+        return 'noun'
+    if 'possess' in text:
+        return 'possessive'
+    if any(k in text for k in ('verb', 'tense', 'perfective', 'causative', 'action')):
+        return 'verb'
+    return 'unknown'
+
+class _Affix:
+    __slots__ = ('form', 'kind', 'category', 'productive', 'stems')
+
+    def __init__(self, form, kind, category, productive=False, stems=None):
+        self.form = form
+        self.kind = kind
+        self.category = category
+        self.productive = productive
+        self.stems = stems
+
+class MorphologySegmenter:
+    """Segment and categorize word types with prefix/suffix tries."""
+
+    def __init__(self, patterns, vocabulary=(), min_stem=2, min_free_stem=3):
+        self.min_stem = min_stem
+        self.min_free_stem = min_free_stem
+        self.vocabulary = set(vocabulary)
+        self.words = {}          # whole-word forms -> category
+        self.prefix_trie = {}
+        self.suffix_trie = {}
+        self._cache = {}
+        self._compile(patterns)
+
+    @classmethod
+    def from_file(cls, path, vocabulary=(), **kwargs):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), vocabulary, **kwargs)
+
+    # -- compilation -------------------------------------------------------
+
+    def _add_affix(self, form, kind, category, productive=False, stems=None):
+        variants = {form.lower(), _fold(form)}
+        for variant in variants:
+            if not variant:
+                continue
+            if kind == 'prefix':
+                node = self.prefix_trie
+                chars = variant
+            else:
+                node = self.suffix_trie
+                chars = reversed(variant)
+            for ch in chars:
+                node = node.setdefault(ch, {})
+            node.setdefault(_END, []).append(_Affix(variant, kind, category, productive, stems))
+
+    def _add_word(self, form, category):
+        for variant in {form.lower(), _fold(form)}:
+            if variant and ' ' not in variant:
+                self.words.setdefault(variant, category)
+
+    def _compile(self, patterns):
+        pronoun_bases = set()
+        for item in patterns.get('pronoun_contractions', {}).get('base_pronouns', []):
+            forms = [item.get('base', ''), item.get('subject', '')] + item.get('variants', [])
+            forms += [f.strip() for f in item.get('emphatic', '').split('/')]
+            pronoun_bases.add(item.get('base', '').lower())
+            for form in forms:
+                self._add_word(form, 'pronoun')
+
+        for item in patterns.get('verb_suffixes', {}).get('patterns', []):
+            category = _category_for(f"{item.get('function', '')} {item.get('description', '')}")
+            for morpheme in item.get('morpheme', '').split('/'):
+                morpheme = morpheme.strip()
+                if morpheme.startswith('-'):
+                    self._add_affix(morpheme[1:], 'suffix', category, productive=True)
+                    # "Can be spelled as -fé, -fe, or -fè": pick up the listed spellings
+                    for alt in re.findall(r'-(\w+)', item.get('notes', '')):
+                        self._add_affix(alt, 'suffix', category, productive=True)
+                elif morpheme.endswith('-'):
+                    self._add_affix(morpheme[:-1], 'prefix', category)
+                elif morpheme:
+                    self._add_word(morpheme, 'particle')
+
+        for item in patterns.get('plural_rules', {}).get('patterns', []):
+            suffix = item.get('suffix', '')
+            if suffix.startswith('-'):
+                self._add_affix(suffix[1:], 'suffix', 'noun')
+
+        templates = patterns.get('word_formation_templates', {})
+        for group in templates.values():
+            if not isinstance(group, list):
+                continue
+            for item in group:
+                parts = [p.strip() for p in item.get('template', '').split('+')]
+                if len(parts) != 2:
+                    continue
+                category = _category_for(item.get('generates', ''))
+                left, right = parts
+                if left.isupper() and not right.isupper():
+                    stems = pronoun_bases if left.startswith('PRONOUN') else None
+                    self._add_affix(right, 'suffix', category, stems=stems)
+                elif right.isupper() and not left.isupper():
+                    self._add_affix(left, 'prefix', category)
+
+        for item in patterns.get('negation_rules', {}).get('markers', []):
+            self._add_word(item.get('form', ''), 'particle')
+
+        for item in patterns.get('possessive_rules', {}).get('patterns', []):
+            for form in item.get('forms', []):
+                self._add_word(form, 'possessive')
+
+        for item in patterns.get('compound_patterns', {}).get('types', []):
+            connector = item.get('connector')
+            if connector:
+                self._add_word(connector, 'conjunction')
+
+    # -- segmentation ------------------------------------------------------
+
+    @staticmethod
+    def _matches(trie, chars):
+        """Affix rules along a path, longest first."""
+        found = []
+        node = trie
+        for ch in chars:
+            node = node.get(ch)
+            if node is None:
+                break
+            found.extend(node.get(_END, ()))
+        return found[::-1]
+
+    def _accept(self, affix, stem):
+        if len(stem) < self.min_stem and not (affix.stems and stem in affix.stems):
+            return False
+        if affix.stems is not None:
+            return stem in affix.stems
+        if stem in self.vocabulary or stem in self.words:
+            return True
+        return affix.productive and len(stem) >= self.min_free_stem
+
+    def segment(self, word):
+        """Segmentation(word, prefixes, stem, suffixes, category) for one word type."""
+        cached = self._cache.get(word)
+        if cached is not None:
+            return cached
+
+        lower = word.lower()
+        prefixes, suffixes = [], []
+        stem = lower
+        category = self.words.get(lower) or self.words.get(_fold(lower))
+
+        if category is None:
+            # Up to two suffix layers (mixi-e, fala-xi), then one prefix (ra-ba)
+            for _ in range(2):
+                for affix in self._matches(self.suffix_trie, reversed(stem)):
+                    rest = stem[:-len(affix.form)]
+                    if self._accept(affix, rest):
+                        suffixes.insert(0, affix)
+                        stem = rest
+                        break
+                else:
+                    break
+            for affix in self._matches(self.prefix_trie, stem):
+                rest = stem[len(affix.form):]
+                if self._accept(affix, rest):
+                    prefixes.append(affix)
+                    stem = rest
+                    break
+
+            # The outermost derivation decides the category
+            for affix in suffixes[::-1] + prefixes:
+                if affix.category != 'unknown':
+                    category = affix.category
+                    break
+
+        result = Segmentation(word, tuple(a.form for a in prefixes), stem,
+                              tuple(a.form for a in suffixes), category)
+        self._cache[word] = result
+        return result
+
+    def segment_all(self, words):
+        """Batch pass over a vocabulary: {word: Segmentation}."""
+        return {word: self.segment(word) for word in words}
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Memory-bounded bigram/trigram counting over the readaloud corpus.
+
+Multi-word patterns (particle + verb, "nan ... ra" constructions) for the
+lexicon and syntax_patterns.json come from here.
+
+Memory bound: a PrunedCounter never holds more than max_entries distinct
+n-grams. When it fills up, every n-gram at or below the current prune
+threshold is dropped and the threshold rises (the word2phrase scheme).
+Frequent n-grams survive once they clear the threshold; counts are never
+over-estimated, but an n-gram that was pruned earlier restarts from zero.
+The final threshold is reported in the output metadata: counts well above
+it are reliable, counts near it are lower bounds. With the default cap the
+whole Bible fits and nothing is pruned.
+
+N-grams never cross a verse boundary. One-letter words (a, n, i, e) are
+kept here, unlike the vocabulary counts, because they anchor most patterns.
+"""
+
+from collections import Counter
+
+from corpus import open_corpus, tokenize_line
+
+class PrunedCounter:
+    """Counter with a hard cap on distinct keys."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.counts = Counter()
+        self.threshold = 0
+        self.prunes = 0
+
+    def add(self, key):
+        counts = self.counts
+        counts[key] += 1
+        if len(counts) > self.max_entries:
+            self._prune()
+
+    def _prune(self):
+        counts = self.counts
+        # Raise the threshold until at least a quarter of the table is freed
+        target = self.max_entries * 3 // 4
+        while len(counts) > target:
+            self.threshold += 1
+            for key in [k for k, c in counts.items() if c <= self.threshold]:
+                del counts[key]
+        self.prunes += 1
+
+def count_ngrams(corpus_path, orders=(2, 3), max_entries=500_000):
+    """One pass over a readaloud directory or corpus.pack; returns {order: PrunedCounter}."""
+    counters = {n: PrunedCounter(max_entries) for n in orders}
+
+    with open_corpus(corpus_path) as corpus:
+        for _, _, _, verses in corpus.iter_chapters():
+            for _, text in verses:
+                tokens = tokenize_line(text, min_len=1)
+                for n, counter in counters.items():
+                    for i in range(len(tokens) - n + 1):
+                        counter.add(' '.join(tokens[i:i + n]))
+
+    return counters
+
+def build_ngram_report(counters, min_count=2):
+    """JSON-ready n-gram artifact, most frequent first."""
+    names = {2: 'bigrams', 3: 'trigrams'}
+    report = {
+        'metadata': {
+            'source': 'Soso Kitaabuie Bible (eBible.org)',
+            'min_count': min_count,
+            'max_entries': {},
+            'prune_threshold': {},
+        }
+    }
+
+    for n, counter in sorted(counters.items()):
+        name = names.get(n, f'{n}grams')
+        kept = [(g, c) for g, c in counter.counts.most_common() if c >= min_count]
+        report['metadata']['max_entries'][name] = counter.max_entries
+        report['metadata']['prune_threshold'][name] = counter.threshold
+        report[name] = dict(kept)
+
+    return report
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Suffix array (+ LCP) over the corpus vocabulary for morpheme search.
+
+Affixes documented in data/morphology_patterns.json (-fé, -xi, ra-, ...)
+become O(m log n) lookups instead of a regex scan over every word:
+
+    index = VocabularySuffixIndex.load('suffix_array.npz')
+    index.suffix('xi')       # words ending in -xi, with corpus frequencies
+    index.prefix('naxa')     # words starting with naxa-
+    index.substring('ɲɛ')    # words containing ɲɛ anywhere
+
+The indexed text is every word type wrapped in separators,
+"\\nw1\\nw2\\n...\\nwN\\n", so a prefix query is "\\n" + p and a suffix query
+is s + "\\n". The suffix array is built by prefix doubling on NumPy arrays
+and the LCP array by Kasai's algorithm; frequent_substrings() uses the LCP
+to enumerate recurring word pieces (candidate affixes) of a given length.
+
+SuffixArray itself is generic and also works over the packed corpus text.
+
+Usage:
+    python suffix_array.py suffix_array.npz -xi naxa- ɲɛ
+"""
+
+import sys
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+SEPARATOR = '\n'
+
+def build_suffix_array(text):
+    """Suffix array of a str by prefix doubling (O(n log^2 n), vectorized)."""
+    n = len(text)
+    if n == 0:
+        return np.zeros(0, dtype=np.int32)
+    rank = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    k = 1
+    while True:
+        # Sort by (rank of first k chars, rank of next k chars); -1 = past the end
+        second = np.full(n, -1, dtype=np.int64)
+        if k < n:
+            second[:n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+        first_sorted, second_sorted = rank[sa], second[sa]
+        changed = np.empty(n, dtype=bool)
+        changed[0] = False
+        changed[1:] = (first_sorted[1:] != first_sorted[:-1]) | (second_sorted[1:] != second_sorted[:-1])
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.cumsum(changed)
+        if rank[sa[-1]] == n - 1:
+            break
+        k *= 2
+    return sa.astype(np.int32)
+
+def build_lcp(text, sa):
+    """Kasai: lcp[i] = common prefix length of suffixes sa[i-1] and sa[i] (lcp[0] = 0)."""
+    n = len(text)
+    rank = np.empty(n, dtype=np.int64)
+    rank[sa] = np.arange(n)
+    rank = rank.tolist()
+    sa_list = sa.tolist()
+    lcp = [0] * n
+    h = 0
+    for i in range(n):
+        r = rank[i]
+        if r > 0:
+            j = sa_list[r - 1]
+            while i + h < n and j + h < n and text[i + h] == text[j + h]:
+                h += 1
+            lcp[r] = h
+            if h:
+                h -= 1
+        else:
+            h = 0
+    return np.array(lcp, dtype=np.int32)
+
+class SuffixArray:
+    """Substring search over any text via its suffix array."""
+
+    def __init__(self, text, sa=None, lcp=None):
+        self.text = text
+        self.sa = build_suffix_array(text) if sa is None else sa
+        self.lcp = build_lcp(text, self.sa) if lcp is None else lcp
+        self._sa_list = self.sa.tolist()
+
+    def range(self, pattern):
+        """[lo, hi) rows of the suffix array whose suffixes start with pattern."""
+        m = len(pattern)
+        key = lambda i: self.text[i:i + m]
+        lo = bisect_left(self._sa_list, pattern, key=key)
+        hi = bisect_right(self._sa_list, pattern, lo=lo, key=key)
+        return lo, hi
+
+    def count(self, pattern):
+        lo, hi = self.range(pattern)
+        return hi - lo
+
+    def positions(self, pattern):
+        """Text offsets of every occurrence, ascending."""
+        lo, hi = self.range(pattern)
+        return np.sort(self.sa[lo:hi])
+
+    def frequent_substrings(self, length, min_count=2):
+        """
+        Every distinct substring of exactly `length` chars occurring at least
+        min_count times, as [(substring, count)] most frequent first.
+
+        Suffixes sharing a length-prefix are adjacent in the suffix array and
+        separated by lcp < length, so each run is one distinct substring.
+        """
+        n = len(self.sa)
+        if n == 0:
+            return []
+        starts = np.flatnonzero(self.lcp < length)
+        ends = np.append(starts[1:], n)
+        counts = ends - starts
+        long_enough = (len(self.text) - self.sa[starts]) >= length
+        keep = np.flatnonzero(long_enough & (counts >= min_count))
+        order = keep[np.argsort(-counts[keep], kind='stable')]
+        return [(self.text[self.sa[starts[i]]:self.sa[starts[i]] + length], int(counts[i]))
+                for i in order.tolist()]
+
+class VocabularySuffixIndex:
+    """Prefix/suffix/substring search over word types, weighted by frequency."""
+
+    def __init__(self, words, frequencies, sa=None, lcp=None):
+        self.words = list(words)
+        self.frequencies = np.asarray(frequencies, dtype=np.int64)
+        text = SEPARATOR + SEPARATOR.join(self.words) + SEPARATOR
+        self.sa = SuffixArray(text, sa, lcp)
+        # Offset of each word's leading separator, for position -> word id
+        lengths = np.fromiter((len(w) + 1 for w in self.words), dtype=np.int64, count=len(self.words))
+        self._word_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    @classmethod
+    def from_vocabulary(cls, vocabulary):
+        """From validated.json's {word: {'frequency': n, ...}} mapping."""
+        words = list(vocabulary)
+        return cls(words, [vocabulary[w]['frequency'] for w in words])
+
+    def _matches(self, pattern):
+        if not pattern:
+            return []
+        positions = self.sa.positions(pattern)
+        ids = np.unique(np.searchsorted(self._word_starts, positions, side='right') - 1)
+        ids = ids[np.argsort(-self.frequencies[ids], kind='stable')]
+        return [(self.words[i], int(self.frequencies[i])) for i in ids.tolist()]
+
+    def substring(self, piece):
+        """[(word, frequency)] of words containing piece, most frequent first."""
+        return self._matches(piece.replace(SEPARATOR, ''))
+
+    def prefix(self, piece):
+        return self._matches(SEPARATOR + piece)
+
+    def suffix(self, piece):
+        return self._matches(piece + SEPARATOR)
+
+    def count(self, piece, where='substring'):
+        """(word types, corpus occurrences) for a piece."""
+        matches = getattr(self, where)(piece)
+        return len(matches), sum(f for _, f in matches)
+
+    def frequent_suffixes(self, length, min_types=5):
+        """Most common word endings of `length` chars by number of word types."""
+        return [(s[:-1], c) for s, c in self.sa.frequent_substrings(length + 1, min_types)
+                if s.endswith(SEPARATOR) and SEPARATOR not in s[:-1]]
+
+    def frequent_prefixes(self, length, min_types=5):
+        """Most common word beginnings of `length` chars by number of word types."""
+        return [(s[1:], c) for s, c in self.sa.frequent_substrings(length + 1, min_types)
+                if s.startswith(SEPARATOR) and SEPARATOR not in s[1:]]
+
+    def save(self, path):
+        np.savez_compressed(path, words=np.array(self.words), frequencies=self.frequencies,
+                            sa=self.sa.sa, lcp=self.sa.lcp)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as npz:
+            return cls(npz['words'].tolist(), npz['frequencies'], npz['sa'], npz['lcp'])
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__.strip().split('Usage:')[1].rstrip())
+        sys.exit(1)
+
+    index = VocabularySuffixIndex.load(sys.argv[1])
+    for query in sys.argv[2:]:
+        if query.startswith('-'):
+            where, piece = 'suffix', query[1:]
+        elif query.endswith('-'):
+            where, piece = 'prefix', query[:-1]
+        else:
+            where, piece = 'substring', query
+        matches = getattr(index, where)(piece)
+        total = sum(f for _, f in matches)
+        print(f"\n=== {query} ({where}): {len(matches):,} words, {total:,} occurrences ===")
+        for word, freq in matches[:15]:
+            print(f"  {word:20} {freq:,}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Symmetric-delete (SymSpell) spelling suggestions for street Soussou input.
+
+Every known form - corpus word types plus lexicon bases and variants - is
+expanded once into its deletes (up to max_distance characters removed from
+its first prefix_length characters). A misspelling is looked up by
+generating its own deletes and intersecting, so only a handful of
+candidates ever get a real edit-distance check instead of the whole
+vocabulary:
+
+    index = SpellingIndex.load('symspell.npz')
+    index.suggest('falaxy')          # [Suggestion('falaxi', 1, 203, 'falaxi'), ...]
+    index.correct_text('n naxa fala a xon')
+
+Suggestions are ranked by (edit distance, Bible frequency). Distance is
+optimal string alignment (Damerau-Levenshtein with adjacent swaps).
+
+File layout (symspell.npz):
+    terms, frequencies, bases      known forms, corpus counts, lexicon base ('' if none)
+    delete_hashes, delete_terms    CRC32 of each delete -> term id, sorted by hash
+    max_distance, prefix_length
+
+Hash collisions only add candidates; every candidate is verified.
+
+Usage:
+    python symspell.py symspell.npz falaxy alatalla
+"""
+
+import sys
+import zlib
+from collections import namedtuple
+from itertools import combinations
+
+import numpy as np
+
+from corpus import normalize_token, tokenize_line
+
+Suggestion = namedtuple('Suggestion', 'term distance frequency base')
+
+def _deletes(word, max_distance, prefix_length):
+    """The word's prefix and every string made by deleting 1..max_distance chars from it."""
+    prefix = word[:prefix_length]
+    out = {prefix}
+    for d in range(1, min(max_distance, len(prefix)) + 1):
+        for removed in combinations(range(len(prefix)), d):
+            out.add(''.join(c for i, c in enumerate(prefix) if i not in removed))
+    return out
+
+def _hash(text):
+    return zlib.crc32(text.encode('utf-8'))
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance, or max_distance + 1 once it is exceeded."""
+    # Common prefix/suffix never costs anything; most candidates share long ones
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    if start > 0:
+        start -= 1          # keep one shared char so a swap across the boundary is seen
+    a, b = a[start:end_a], b[start:end_b]
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if not a or not b:
+        return max(len(a), len(b))
+
+    # Banded DP: only cells within max_distance of the diagonal can stay in range
+    over = max_distance + 1
+    n = len(b)
+    prev2 = None
+    prev = list(range(n + 1))
+    for i in range(1, len(a) + 1):
+        lo = max(1, i - max_distance)
+        hi = min(n, i + max_distance)
+        cur = [over] * (n + 1)
+        cur[0] = i if i <= max_distance else over
+        ca = a[i - 1]
+        best = cur[0]
+        for j in range(lo, hi + 1):
+            value = prev[j - 1] if ca == b[j - 1] else prev[j - 1] + 1
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if cur[j - 1] + 1 < value:
+                value = cur[j - 1] + 1
+            if (i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1]
+                    and prev2[j - 2] + 1 < value):
+                value = prev2[j - 2] + 1
+            cur[j] = value
+            if value < best:
+                best = value
+        if best > max_distance:
+            return over
+        prev2, prev = prev, cur
+    return prev[n] if prev[n] <= max_distance else over
+
+def build_spelling_index(word_counts, lexicon=None, max_distance=2, prefix_length=7):
+    """
+    word_counts: {word: corpus frequency}; lexicon: data/lexicon.json entries
+    (bases and variants are added with their corpus frequency, 0 if unseen).
+    """
+    terms = dict(word_counts)
+    bases = {}
+    for entry in lexicon or []:
+        base = entry.get('base', '').lower()
+        for form in [entry.get('base', '')] + entry.get('variants', []):
+            form = normalize_token(form, min_len=1)
+            if not form or ' ' in form:
+                continue
+            terms.setdefault(form, 0)
+            bases.setdefault(form, base)
+
+    ordered = sorted(terms, key=lambda w: (-terms[w], w))
+    hashes, ids = [], []
+    for term_id, term in enumerate(ordered):
+        for delete in _deletes(term, max_distance, prefix_length):
+            hashes.append(_hash(delete))
+            ids.append(term_id)
+
+    hashes = np.array(hashes, dtype=np.uint32)
+    ids = np.array(ids, dtype=np.int32)
+    order = np.argsort(hashes, kind='stable')
+    return SpellingIndex(ordered, [terms[t] for t in ordered], [bases.get(t, '') for t in ordered],
+                         hashes[order], ids[order], max_distance, prefix_length)
+
+class SpellingIndex:
+    """suggest() / correct_text() over a prebuilt symmetric-delete table."""
+
+    def __init__(self, terms, frequencies, bases, delete_hashes, delete_terms,
+                 max_distance, prefix_length):
+        self.terms = list(terms)
+        self.frequencies = np.asarray(frequencies, dtype=np.int64)
+        self.bases = list(bases)
+        self.delete_hashes = delete_hashes
+        self.delete_terms = delete_terms
+        self.max_distance = int(max_distance)
+        self.prefix_length = int(prefix_length)
+        self.term_ids = {t: i for i, t in enumerate(self.terms)}
+        self.lengths = np.fromiter(map(len, self.terms), dtype=np.int64, count=len(self.terms))
+        self._cache = {}
+
+    def save(self, path):
+        np.savez_compressed(path, terms=np.array(self.terms), frequencies=self.frequencies,
+                            bases=np.array(self.bases), delete_hashes=self.delete_hashes,
+                            delete_terms=self.delete_terms, max_distance=self.max_distance,
+                            prefix_length=self.prefix_length)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as npz:
+            return cls(npz['terms'].tolist(), npz['frequencies'], npz['bases'].tolist(),
+                       npz['delete_hashes'], npz['delete_terms'],
+                       npz['max_distance'], npz['prefix_length'])
+
+    def _candidates(self, word, max_distance):
+        keys = np.array([_hash(d) for d in _deletes(word, max_distance, self.prefix_length)],
+                        dtype=np.uint32)
+        lo = np.searchsorted(self.delete_hashes, keys, side='left')
+        hi = np.searchsorted(self.delete_hashes, keys, side='right')
+        hits = [self.delete_terms[a:b] for a, b in zip(lo.tolist(), hi.tolist()) if b > a]
+        if not hits:
+            return []
+        ids = np.unique(np.concatenate(hits))
+        # Forms whose length differs by more than max_distance can never match
+        ids = ids[np.abs(self.lengths[ids] - len(word)) <= max_distance]
+        return ids.tolist()
+
+    def suggest(self, word, max_distance=None, limit=5):
+        """
+        Known forms within max_distance edits of word, as [Suggestion], closest
+        first and most frequent first among equals. An exact match comes first.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(f"index was built for max_distance <= {self.max_distance}")
+        word = normalize_token(word, min_len=1) or ''
+        key = (word, max_distance, limit)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        results = []
+        for term_id in self._candidates(word, max_distance):
+            term = self.terms[term_id]
+            distance = edit_distance(word, term, max_distance)
+            if distance <= max_distance:
+                results.append(Suggestion(term, distance, int(self.frequencies[term_id]),
+                                          self.bases[term_id] or None))
+        results.sort(key=lambda s: (s.distance, -s.frequency, s.term))
+        results = results[:limit]
+        self._cache[key] = results
+        return results
+
+    def suggest_many(self, words, max_distance=None, limit=5):
+        """{word: [Suggestion]} for a batch; repeated words are looked up once."""
+        return {w: self.suggest(w, max_distance, limit) for w in dict.fromkeys(words)}
+
+    def correct_text(self, text, max_distance=None):
+        """Replace every unknown token with its best suggestion (kept as-is if none)."""
+        out = []
+        for token in tokenize_line(text, min_len=1):
+            if token in self.term_ids:
+                out.append(token)
+                continue
+            best = self.suggest(token, max_distance, limit=1)
+            out.append(best[0].term if best else token)
+        return ' '.join(out)
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__.strip().split('Usage:')[1].rstrip())
+        sys.exit(1)
+
+    index = SpellingIndex.load(sys.argv[1])
+    for word in sys.argv[2:]:
+        print(f"\n=== {word} ===")
+        for s in index.suggest(word):
+            base = f"  (lexicon: {s.base})" if s.base else ''
+            print(f"  {s.term:20} d={s.distance}  {s.frequency:,}{base}")
+
+if __name__ == '__main__':
+    main()
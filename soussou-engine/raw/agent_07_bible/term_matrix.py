@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Per-chapter and per-book term-frequency matrices (sparse CSR, NumPy).
+
+Built from the per-chapter Counters extract_vocabulary.py already has, and
+saved as one compressed .npz so book-level analytics are vector operations
+instead of another tokenization pass:
+
+    vocab                  term id -> word (ids follow validated.json order,
+                           i.e. most frequent first)
+    chapter_{indptr,indices,data}, chapter_book, chapter_number, chapter_file
+    book_{indptr,indices,data}, book_codes
+
+Row r of a CSR matrix holds term ids indices[indptr[r]:indptr[r+1]] with
+counts data[indptr[r]:indptr[r+1]], term ids ascending.
+"""
+
+import numpy as np
+
+from corpus import chapter_ref
+
+def _csr_from_counters(counters, term_ids):
+    """Stack Counters into CSR arrays (indptr, indices, data)."""
+    indptr = np.zeros(len(counters) + 1, dtype=np.int64)
+    indices = []
+    data = []
+    for r, counts in enumerate(counters):
+        ids = np.fromiter((term_ids[w] for w in counts), dtype=np.int32, count=len(counts))
+        vals = np.fromiter(counts.values(), dtype=np.int32, count=len(counts))
+        order = np.argsort(ids, kind='stable')
+        indices.append(ids[order])
+        data.append(vals[order])
+        indptr[r + 1] = indptr[r] + len(counts)
+    indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+    data = np.concatenate(data) if data else np.zeros(0, dtype=np.int32)
+    return indptr, indices, data
+
+def build_term_matrix(chapter_counts, vocab):
+    """
+    chapter_counts: [(chapter_file, Counter)] in corpus order.
+    vocab: every word that appears, in the desired term-id order.
+    """
+    term_ids = {w: i for i, w in enumerate(vocab)}
+
+    chapter_book, chapter_number, chapter_file = [], [], []
+    book_codes, book_counters, book_rows = [], [], {}
+    for txt_file, counts in chapter_counts:
+        book, chapter = chapter_ref(txt_file)
+        chapter_book.append(book)
+        chapter_number.append(chapter)
+        chapter_file.append(txt_file.name)
+        if book not in book_rows:
+            book_rows[book] = len(book_codes)
+            book_codes.append(book)
+            book_counters.append({})
+        merged = book_counters[book_rows[book]]
+        for word, count in counts.items():
+            merged[word] = merged.get(word, 0) + count
+
+    c_indptr, c_indices, c_data = _csr_from_counters([c for _, c in chapter_counts], term_ids)
+    b_indptr, b_indices, b_data = _csr_from_counters(book_counters, term_ids)
+
+    return {
+        'vocab': np.array(vocab),
+        'chapter_indptr': c_indptr,
+        'chapter_indices': c_indices,
+        'chapter_data': c_data,
+        'chapter_book': np.array(chapter_book),
+        'chapter_number': np.array(chapter_number, dtype=np.int32),
+        'chapter_file': np.array(chapter_file),
+        'book_indptr': b_indptr,
+        'book_indices': b_indices,
+        'book_data': b_data,
+        'book_codes': np.array(book_codes),
+    }
+
+def save_term_matrix(path, arrays):
+    np.savez_compressed(path, **arrays)
+
+class TermMatrix:
+    """Read-side analytics over term_matrix.npz."""
+
+    def __init__(self, path):
+        with np.load(path) as npz:
+            arrays = {k: npz[k] for k in npz.files}
+        self.vocab = arrays['vocab']
+        self.term_ids = {w: i for i, w in enumerate(self.vocab.tolist())}
+        self.book_codes = arrays['book_codes'].tolist()
+        self.chapter_book = arrays['chapter_book']
+        self.chapter_number = arrays['chapter_number']
+        self.chapter_file = arrays['chapter_file']
+        self._chapter = (arrays['chapter_indptr'], arrays['chapter_indices'], arrays['chapter_data'])
+        self._book = (arrays['book_indptr'], arrays['book_indices'], arrays['book_data'])
+
+    @staticmethod
+    def _dense(csr, n_cols):
+        indptr, indices, data = csr
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        out = np.zeros((len(indptr) - 1, n_cols), dtype=np.int64)
+        out[rows, indices] = data
+        return out
+
+    def book_matrix(self):
+        """Dense books x terms counts (67 x V is small)."""
+        return self._dense(self._book, len(self.vocab))
+
+    def chapter_matrix(self):
+        """Dense chapters x terms counts."""
+        return self._dense(self._chapter, len(self.vocab))
+
+    def book_row(self, book):
+        """{word: count} for one book."""
+        indptr, indices, data = self._book
+        r = self.book_codes.index(book)
+        sl = slice(indptr[r], indptr[r + 1])
+        return dict(zip(self.vocab[indices[sl]].tolist(), data[sl].tolist()))
+
+    def distinctive_terms(self, book, top_k=20, min_count=5):
+        """
+        Words over-represented in `book` versus the rest of the corpus,
+        by smoothed log-ratio of relative frequencies.
+        """
+        m = self.book_matrix()
+        r = self.book_codes.index(book)
+        inside = m[r].astype(np.float64)
+        outside = m.sum(axis=0) - inside
+        score = np.log((inside + 0.5) / (inside.sum() + 0.5)) - np.log((outside + 0.5) / (outside.sum() + 0.5))
+        score[inside < min_count] = -np.inf
+        best = np.argsort(-score, kind='stable')[:top_k]
+        return [(str(self.vocab[i]), int(inside[i]), round(float(score[i]), 3))
+                for i in best if np.isfinite(score[i])]
+
+    def dispersion(self):
+        """
+        Juilland's D per term across books (1 = evenly spread, 0 = one book),
+        normalized for book length. Returns an array aligned with vocab.
+        """
+        m = self.book_matrix().astype(np.float64)
+        sizes = m.sum(axis=1, keepdims=True)
+        rel = m / np.where(sizes == 0, 1, sizes)
+        mean = rel.mean(axis=0)
+        std = rel.std(axis=0)
+        n = m.shape[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d = 1.0 - (std / mean) / np.sqrt(n - 1)
+        return np.nan_to_num(d, nan=0.0)
+
+    def coverage_curve(self, points=(10, 50, 100, 500, 1000, 5000)):
+        """Fraction of all tokens covered by the N most frequent types."""
+        totals = np.sort(np.bincount(self._chapter[1], weights=self._chapter[2],
+                                     minlength=len(self.vocab)))[::-1]
+        cumulative = np.cumsum(totals) / totals.sum()
+        return {n: round(float(cumulative[min(n, len(cumulative)) - 1]), 4) for n in points}
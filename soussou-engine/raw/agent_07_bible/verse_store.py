@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Structured verse store (SQLite) built from the readaloud chapters.
+
+Each chapter is parsed once (title line, "N." chapter marker, one verse
+per line - see corpus.iter_verses) into verse records that example-sentence
+lookup, alignment and other verse-level consumers can query directly:
+
+    store = VerseStore('verses.db')
+    store.verse('GEN', 1, 1).text
+    store.chapter('JHN', 3)               # [Verse, ...]
+    store.at_token(123456)                # verse containing corpus token 123456
+
+Schema:
+    chapters(id, file, book, chapter, title)
+    verses(id, chapter_id, book, chapter, verse, text, tokens,
+           token_start, token_count)
+
+verse 0 holds a chapter's heading (book title). tokens is the normalized
+word sequence (corpus.tokenize_line with one-letter words kept, as the
+concordance indexes it), space separated; token_start is the verse's first
+token in the corpus-wide token stream, so [token_start, token_start +
+token_count) is its token span and matches concordance offsets within the
+verse. Indexed on (book, chapter, verse) and token_start.
+
+Usage:
+    python verse_store.py verses.db GEN 1 1
+"""
+
+import os
+import sqlite3
+import sys
+from collections import namedtuple
+
+from corpus import open_corpus, tokenize_line
+
+# Same token stream as the concordance (one-letter pronouns included)
+MIN_LEN = 1
+
+Verse = namedtuple('Verse', 'book chapter verse text tokens token_start token_count')
+
+SCHEMA = """
+CREATE TABLE chapters (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    book TEXT NOT NULL,
+    chapter INTEGER NOT NULL,
+    title TEXT
+);
+CREATE TABLE verses (
+    id INTEGER PRIMARY KEY,
+    chapter_id INTEGER NOT NULL REFERENCES chapters(id),
+    book TEXT NOT NULL,
+    chapter INTEGER NOT NULL,
+    verse INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    token_start INTEGER NOT NULL,
+    token_count INTEGER NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX verses_ref ON verses(book, chapter, verse);
+CREATE INDEX verses_token_start ON verses(token_start);
+CREATE UNIQUE INDEX chapters_file ON chapters(file);
+"""
+
+_VERSE_COLUMNS = 'book, chapter, verse, text, tokens, token_start, token_count'
+
+def build_verse_store(corpus_path, output_path):
+    """
+    Parse every chapter of a readaloud directory or corpus.pack into SQLite.
+
+    Returns (chapters, verses, tokens).
+    """
+    tmp_path = f"{output_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(SCHEMA)
+    chapters = verses = position = 0
+    with conn, open_corpus(corpus_path) as corpus:
+        for chapter_id, (name, book, chapter, rows) in enumerate(corpus.iter_chapters()):
+            title = next((text for verse, text in rows if verse == 0), None)
+            conn.execute('INSERT INTO chapters VALUES (?, ?, ?, ?, ?)',
+                         (chapter_id, name, book, chapter, title))
+            records = []
+            for verse, text in rows:
+                tokens = tokenize_line(text, MIN_LEN)
+                records.append((chapter_id, book, chapter, verse, text, ' '.join(tokens),
+                                position, len(tokens)))
+                position += len(tokens)
+            conn.executemany(f'INSERT INTO verses (chapter_id, {_VERSE_COLUMNS}) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', records)
+            chapters += 1
+            verses += len(records)
+        # Bulk load first, index once at the end
+        conn.executescript(INDEXES)
+    conn.execute('VACUUM')
+    conn.close()
+    os.replace(tmp_path, output_path)
+    return chapters, verses, position
+
+class VerseStore:
+    """Read-side API over verses.db."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def _verses(self, where, params):
+        rows = self.conn.execute(f'SELECT {_VERSE_COLUMNS} FROM verses WHERE {where} ORDER BY id',
+                                 params)
+        return [Verse(*row) for row in rows]
+
+    def verse(self, book, chapter, verse):
+        """One Verse, or None."""
+        found = self._verses('book = ? AND chapter = ? AND verse = ?', (book, chapter, verse))
+        return found[0] if found else None
+
+    def chapter(self, book, chapter, include_heading=False):
+        """Every verse of a chapter, in order (verse 0 only if include_heading)."""
+        first = 0 if include_heading else 1
+        return self._verses('book = ? AND chapter = ? AND verse >= ?', (book, chapter, first))
+
+    def book(self, book):
+        return self._verses('book = ? AND verse > 0', (book,))
+
+    def at_token(self, position):
+        """The verse whose token span contains a corpus-wide token position."""
+        found = self._verses('id = (SELECT id FROM verses WHERE token_start <= ? AND token_count > 0 '
+                             'ORDER BY token_start DESC LIMIT 1)', (position,))
+        if found and position < found[0].token_start + found[0].token_count:
+            return found[0]
+        return None
+
+    def books(self):
+        """[(book, chapters)] in corpus order."""
+        return self.conn.execute('SELECT book, COUNT(*) FROM chapters GROUP BY book '
+                                 'ORDER BY MIN(id)').fetchall()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    if len(sys.argv) < 4:
+        print(__doc__.strip().split('Usage:')[1].rstrip())
+        sys.exit(1)
+
+    with VerseStore(sys.argv[1]) as store:
+        book, chapter = sys.argv[2], int(sys.argv[3])
+        if len(sys.argv) > 4:
+            verses = [store.verse(book, chapter, int(sys.argv[4]))]
+        else:
+            verses = store.chapter(book, chapter)
+        for v in verses:
+            if v:
+                print(f"  {v.book} {v.chapter}:{v.verse}  {v.text}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Backfill Corpus Frequencies into the Master Lexicon
+
+Entries added by merge_training_context.py (street Soussou words and every
+multi-word phrase) arrive with frequency 0 and sink to the bottom of any
+frequency-ranked list. This script counts every lexicon base, variant and
+phrase in the Bible readaloud corpus in ONE pass and writes the counts back.
+
+Rules:
+- Patterns and corpus tokens go through the same normalize_word() as
+  merge_lexicon.py, so "N'na fafé" matches "nna fafe" in the text
+- All patterns are compiled into one token trie; each corpus line is scanned
+  once, walking the trie from every token position (phrases never span lines)
+- An entry's count = sum over its distinct normalized forms (base + variants)
+- Existing Bible frequencies are preserved: frequency = max(old, corpus count)
+"""
+
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from lexicon_io import atomic_write_json, file_lock, load_json
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+sys.path.insert(0, str(SCRIPT_DIR.parent / "raw" / "agent_07_bible"))
+from merge_lexicon import normalize_word
+from corpus import WORD_RE
+
+# Paths
+BASE_DIR = "/home/user/ZION/soussou-engine"
+LEXICON_FILE = os.path.join(BASE_DIR, "data/lexicon.json")
+CORPUS_DIR = os.path.join(BASE_DIR, "raw/agent_07_bible/readaloud")
+
+_TERMINAL = None  # trie key marking "a pattern ends here"
+
+@lru_cache(maxsize=None)
+def normalize_token(token):
+    """normalize_word() is ~30 regex passes; corpus tokens repeat, so cache per type"""
+    return normalize_word(token)
+
+def build_pattern_trie(lexicon):
+    """
+    Compile every distinct normalized base/variant into a token trie.
+
+    Returns (trie, entry_patterns) where entry_patterns[i] is the set of
+    normalized pattern strings belonging to lexicon[i].
+    """
+    trie = {}
+    entry_patterns = []
+
+    for entry in lexicon:
+        patterns = set()
+        for form in [entry.get('base', '')] + entry.get('variants', []):
+            normalized = normalize_word(form)
+            if normalized:
+                patterns.add(normalized)
+        entry_patterns.append(patterns)
+
+        for pattern in patterns:
+            node = trie
+            for token in pattern.split():
+                node = node.setdefault(token, {})
+            node[_TERMINAL] = pattern
+
+    return trie, entry_patterns
+
+def iter_corpus_lines(corpus_dir):
+    """Yield normalized token lists, one per corpus line"""
+    for txt_file in sorted(Path(corpus_dir).glob('*_read.txt')):
+        with open(txt_file, 'r', encoding='utf-8-sig') as f:
+            for line in f:
+                tokens = []
+                for word in WORD_RE.findall(line):
+                    token = normalize_token(word)
+                    if token:
+                        tokens.extend(token.split())
+                if tokens:
+                    yield tokens
+
+def count_patterns(trie, lines):
+    """Count every trie pattern occurrence across all token lines (single pass)"""
+    counts = {}
+    for tokens in lines:
+        n = len(tokens)
+        for start in range(n):
+            node = trie.get(tokens[start])
+            pos = start + 1
+            while node is not None:
+                pattern = node.get(_TERMINAL)
+                if pattern is not None:
+                    counts[pattern] = counts.get(pattern, 0) + 1
+                if pos >= n:
+                    break
+                node = node.get(tokens[pos])
+                pos += 1
+    return counts
+
+def backfill(lexicon, corpus_dir):
+    """Update lexicon frequencies in place; return (updated, phrases_updated)"""
+    trie, entry_patterns = build_pattern_trie(lexicon)
+    counts = count_patterns(trie, iter_corpus_lines(corpus_dir))
+
+    updated = 0
+    phrases_updated = 0
+    for entry, patterns in zip(lexicon, entry_patterns):
+        corpus_freq = sum(counts.get(p, 0) for p in patterns)
+        if corpus_freq > entry.get('frequency', 0):
+            entry['frequency'] = corpus_freq
+            updated += 1
+            if entry.get('is_phrase'):
+                phrases_updated += 1
+
+    return updated, phrases_updated
+
+def main():
+    print("Backfilling corpus frequencies...")
+
+    with file_lock(LEXICON_FILE):
+        lexicon = load_json(LEXICON_FILE)
+        zero_before = sum(1 for e in lexicon if not e.get('frequency'))
+
+        updated, phrases_updated = backfill(lexicon, CORPUS_DIR)
+        zero_after = sum(1 for e in lexicon if not e.get('frequency'))
+
+        atomic_write_json(LEXICON_FILE, lexicon, indent=2)
+
+    print(f"\nBackfill complete!")
+    print(f"  - Entries updated: {updated}")
+    print(f"  - Phrases updated: {phrases_updated}")
+    print(f"  - Zero-frequency entries: {zero_before} -> {zero_after}")
+
+if __name__ == '__main__':
+    main()
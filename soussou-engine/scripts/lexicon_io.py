@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Soussou Engine - Crash-safe file writes
+
+Shared write layer for every script that produces files under data/
+(lexicon.json, stats.md, merge_report.md, ...).
+
+Rules:
+- Never stream into the live file -> write a temp file in the same directory,
+  fsync it, then os.replace() it over the target (atomic on POSIX)
+- Read-modify-write cycles hold an advisory lock (<file>.lock) so several
+  merge workers can run at the same time without losing each other's updates
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """
+    Hold an advisory flock on <path>.lock for the duration of the block.
+
+    The lock lives in a sidecar file so it survives the target being replaced
+    by os.replace() (locking the target itself would lock a dead inode).
+    """
+    lock_path = f"{path}.lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _fsync_dir(directory):
+    """Flush the directory entry so the rename itself survives a crash"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_open(path, mode='w', encoding='utf-8'):
+    """
+    Open a temp file next to `path`; on clean exit fsync it and rename it over
+    `path`. On error the temp file is removed and `path` is left untouched.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        kwargs = {} if 'b' in mode else {'encoding': encoding}
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the permissions of the file we replace
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Atomically replace `path` with `data` serialized as JSON"""
+    dump_kwargs.setdefault('ensure_ascii', False)
+    with atomic_open(path) as f:
+        json.dump(data, f, **dump_kwargs)
+
+
+def atomic_write_text(path, text):
+    """Atomically replace `path` with `text`"""
+    with atomic_open(path) as f:
+        f.write(text)
+
+
+def load_json(path):
+    """Load a JSON file written by this layer (never sees a partial file)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
@@ -11,10 +11,11 @@ Rules:
 - Preserve frequency data from Bible for existing words
 """
 
-import json
 import os
 from datetime import datetime
 
+from lexicon_io import atomic_write_json, atomic_write_text, file_lock, load_json
+
 # Paths
 BASE_DIR = "/home/user/ZION/soussou-engine"
 CONTEXT_FILE = os.path.join(BASE_DIR, "raw/context_extraction.json")
@@ -36,15 +37,19 @@ def extract_base_word(soussou_text):
     return words[0]
 
 def main():
+    # Hold the lexicon lock across the whole read-modify-write so concurrent
+    # merges serialize instead of overwriting each other's additions
+    with file_lock(LEXICON_FILE):
+        merge(LEXICON_FILE)
+
+def merge(lexicon_file):
     print("Loading files...")
 
     # Load context extraction
-    with open(CONTEXT_FILE, 'r', encoding='utf-8') as f:
-        context_entries = json.load(f)
+    context_entries = load_json(CONTEXT_FILE)
 
     # Load lexicon
-    with open(LEXICON_FILE, 'r', encoding='utf-8') as f:
-        lexicon = json.load(f)
+    lexicon = load_json(lexicon_file)
 
     print(f"Loaded {len(context_entries)} context entries")
     print(f"Loaded {len(lexicon)} lexicon entries")
@@ -189,8 +194,7 @@ def main():
 
     # Save updated lexicon
     print(f"\nSaving updated lexicon with {len(lexicon)} entries...")
-    with open(LEXICON_FILE, 'w', encoding='utf-8') as f:
-        json.dump(lexicon, f, ensure_ascii=False, indent=2)
+    atomic_write_json(lexicon_file, lexicon, indent=2)
 
     # Generate merge report
     generate_report(words_added, words_updated, phrases_added, len(context_entries), len(lexicon))
@@ -331,8 +335,7 @@ While adding:
 - Real conversational context
 """
 
-    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
-        f.write(report)
+    atomic_write_text(REPORT_FILE, report)
 
     print(f"Report saved to: {REPORT_FILE}")
 